@@ -1,12 +1,18 @@
 import streamlit as st
-import pandas as pd
 import os
+import atexit
+import importlib
+import logging
+import logging.handlers
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import json
 
 from agents.scheduling_agent import SchedulingAgent
 from agents.notification_agent import NotificationAgent
-from utils.data_generator import DataGenerator
+from utils.data_generator import DataGenerator, DOCTORS, INSURANCE_PROVIDERS
 from utils.patient_manager import PatientManager
 from utils.excel_manager import ExcelManager
 
@@ -17,62 +23,94 @@ st.set_page_config(
     layout="wide"
 )
 
+@st.cache_resource
+def start_log_listener():
+    """Route utils.* logging through a queue so a background thread does the formatting and writes"""
+    log_queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    utils_logger = logging.getLogger('utils')
+    utils_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    utils_logger.setLevel(logging.INFO)
+    utils_logger.propagate = False
+    return listener
+
+start_log_listener()
+
+# Created once all data files exist; missing files are regenerated either way
+DATA_READY_MARKER = '.data_ready'
+
+# Selectbox options, built once instead of on every rerun
+DOCTOR_OPTIONS = ("Select a doctor...", *DOCTORS)
+INSURANCE_OPTIONS = ("Select your insurance...", *INSURANCE_PROVIDERS)
+
 # Initialize session state
-if 'patient_data' not in st.session_state:
-    st.session_state.patient_data = {}
-if 'data_initialized' not in st.session_state:
-    st.session_state.data_initialized = False
-if 'form_submitted' not in st.session_state:
-    st.session_state.form_submitted = False
-if 'appointment_booked' not in st.session_state:
-    st.session_state.appointment_booked = False
+for key, default in {
+    'patient_data': {},
+    'form_submitted': False,
+    'appointment_booked': False,
+    'selected_doctor': None,
+    'current_page': 'book_appointment'
+}.items():
+    st.session_state.setdefault(key, default)
 
 # Initialize components
-@st.cache_resource
+@st.cache_resource(show_spinner="Initializing system and generating synthetic data...")
 def initialize_components():
-    """Initialize all components and generate synthetic data if needed"""
+    """Initialize all components, generating any missing data files first"""
     data_gen = DataGenerator()
-    patient_mgr = PatientManager()
     excel_mgr = ExcelManager()
+    
+    data_files = [
+        ('patients.csv', data_gen.generate_patients_csv),
+        ('doctor_schedule.xlsx', data_gen.generate_doctor_schedule),
+        ('appointments.xlsx', excel_mgr.create_appointments_file),
+        ('admin_report.xlsx', excel_mgr.create_admin_report_file),
+    ]
+    
+    # Runs once per process; the marker file records a finished setup, but a
+    # data file deleted since then is still regenerated
+    if not os.path.exists(DATA_READY_MARKER) or not all(os.path.exists(path) for path, _ in data_files):
+        for path, generate in data_files:
+            if not os.path.exists(path):
+                generate()
+        
+        open(DATA_READY_MARKER, 'w').close()
+    
+    patient_mgr = PatientManager()
     scheduling_agent = SchedulingAgent()
     notification_agent = NotificationAgent()
     
+    # Import the PDF module (and ReportLab) in the background so the first
+    # "Download Confirmation" click doesn't pay the import cost
+    threading.Thread(target=importlib.import_module, args=('utils.pdf_generator',), daemon=True).start()
+    
     return data_gen, patient_mgr, excel_mgr, scheduling_agent, notification_agent
 
-def ensure_data_files():
-    """Ensure all required data files exist"""
-    if not st.session_state.data_initialized:
-        data_gen, _, excel_mgr, _, _ = initialize_components()
-        
-        with st.spinner("Initializing system and generating synthetic data..."):
-            # Generate patients.csv if it doesn't exist
-            if not os.path.exists('patients.csv'):
-                st.info("Generating synthetic patient data...")
-                data_gen.generate_patients_csv()
-            
-            # Generate doctor_schedule.xlsx if it doesn't exist
-            if not os.path.exists('doctor_schedule.xlsx'):
-                st.info("Generating doctor schedule data...")
-                data_gen.generate_doctor_schedule()
-            
-            # Create appointments.xlsx if it doesn't exist
-            if not os.path.exists('appointments.xlsx'):
-                excel_mgr.create_appointments_file()
-            
-            # Create admin_report.xlsx if it doesn't exist
-            if not os.path.exists('admin_report.xlsx'):
-                excel_mgr.create_admin_report_file()
-        
-        st.session_state.data_initialized = True
-        st.success("System initialized successfully!")
+@st.cache_data(ttl=60, show_spinner=False)
+def get_cached_slots(doctor):
+    """Get available slots for a doctor, re-read from the schedule at most once a minute"""
+    _, _, _, scheduling_agent, _ = initialize_components()
+    return scheduling_agent.get_available_slots(doctor)
+
+@st.cache_data(show_spinner=False)
+def load_appointments(mtime):
+    """Load all appointments; keyed on the database file's mtime so new bookings are picked up"""
+    _, _, excel_mgr, _, _ = initialize_components()
+    df = excel_mgr.get_appointments()
+    
+    # Low-cardinality columns become categoricals so the page's equality filters compare codes
+    return df.astype({'Status': 'category', 'Patient_Type': 'category',
+                      'Doctor': 'category', 'Insurance_Carrier': 'category'})
 
 def main():
     st.title("🏥 Medical Appointment Scheduling System")
     st.markdown("---")
     
-    # Ensure data files are initialized
-    ensure_data_files()
-    
     # Get components
     data_gen, patient_mgr, excel_mgr, scheduling_agent, notification_agent = initialize_components()
     
@@ -92,12 +130,9 @@ def main():
             st.session_state.patient_data = {}
             st.session_state.form_submitted = False
             st.session_state.appointment_booked = False
+            st.session_state.selected_doctor = None
             st.rerun()
     
-    # Navigation
-    if 'current_page' not in st.session_state:
-        st.session_state.current_page = 'book_appointment'
-    
     # Navigation buttons
     col_nav1, col_nav2, col_nav3 = st.columns(3)
     
@@ -114,6 +149,7 @@ def main():
             st.session_state.patient_data = {}
             st.session_state.form_submitted = False
             st.session_state.appointment_booked = False
+            st.session_state.selected_doctor = None
             st.session_state.current_page = 'book_appointment'
             st.rerun()
     
@@ -127,191 +163,215 @@ def main():
         display_appointment_confirmation()
         return
     
-    # Main appointment booking form
-    st.header("📋 Book Your Appointment")
-    
-    # Show welcome message
-    st.markdown("""
-    Welcome to our Medical Appointment Scheduling System! Please fill out the form below 
-    to schedule your appointment. All required fields are marked with an asterisk (*).
-    """)
-    
-    with st.form("appointment_form"):
-        # Personal Information Section
-        st.subheader("📋 Personal Information")
+    # Main appointment booking form, rendered into a placeholder so it can be
+    # swapped for the confirmation without another script run
+    booked = False
+    booking_page = st.empty()
+    with booking_page.container():
+        st.header("📋 Book Your Appointment")
         
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            full_name = st.text_input(
-                "Full Name *",
-                placeholder="Enter your full name (e.g., John Smith)",
-                help="Please enter your first and last name as it appears on your ID"
-            )
-            
-            phone = st.text_input(
-                "Phone Number *",
-                placeholder="+91 - 98765 43210",
-                help="Enter your phone number in Indian format for SMS confirmations and reminders"
-            )
+        # Show welcome message
+        st.markdown("""
+        Welcome to our Medical Appointment Scheduling System! Please fill out the form below 
+        to schedule your appointment. All required fields are marked with an asterisk (*).
+        """)
         
-        with col2:
-            dob = st.date_input(
-                "Date of Birth *",
-                min_value=datetime(1920, 1, 1),
-                max_value=datetime.now(),
-                help="Your date of birth helps us locate your medical records"
-            )
+        # The doctor is picked in its own form so that slots are only loaded when asked for,
+        # not re-fetched on every interaction with the appointment form below
+        with st.form("slot_picker"):
+            st.subheader("🩺 Choose Your Doctor")
             
-            email = st.text_input(
-                "Email Address *",
-                placeholder="john.smith@email.com",
-                help="Email address for appointment confirmations and forms"
-            )
-        
-        # Appointment Details Section
-        st.subheader("👨‍⚕️ Appointment Details")
-        
-        col3, col4 = st.columns(2)
-        
-        with col3:
-            preferred_doctor = st.selectbox(
-                "Preferred Doctor *",
-                options=["Select a doctor..."] + data_gen.doctors,
-                help="Choose your preferred doctor from our available physicians"
-            )
-        
-        # Time slot selection (will be populated after doctor selection)
-        if preferred_doctor and preferred_doctor != "Select a doctor...":
-            with st.spinner(f"Loading available slots for {preferred_doctor}..."):
-                available_slots = scheduling_agent.get_available_slots(preferred_doctor)
+            col_doctor, col_load = st.columns([3, 1], vertical_alignment="bottom")
             
-            if available_slots:
-                time_slot_options = ["Select a time slot..."] + [slot['display'] for slot in available_slots]
-                selected_time_slot = st.selectbox(
-                    "Available Time Slots *",
-                    options=time_slot_options,
-                    help="Choose your preferred appointment time from available slots"
+            with col_doctor:
+                doctor_choice = st.selectbox(
+                    "Preferred Doctor *",
+                    options=DOCTOR_OPTIONS,
+                    help="Choose your preferred doctor from our available physicians"
                 )
-            else:
-                st.warning(f"No available slots found for {preferred_doctor}. Please try another doctor.")
-                selected_time_slot = "Select a time slot..."
-        else:
-            st.info("Please select a doctor first to see available time slots.")
-            selected_time_slot = "Select a time slot..."
-        
-        with col4:
-            appointment_reason = st.text_area(
-                "Reason for Visit (Optional)",
-                placeholder="Brief description of your symptoms or reason for the appointment",
-                max_chars=200,
-                help="Optional: Help us prepare for your visit by describing your symptoms or concerns"
-            )
-        
-        # Insurance Information Section
-        st.subheader("🏥 Insurance Information")
-        
-        col5, col6 = st.columns(2)
-        
-        with col5:
-            insurance_provider = st.selectbox(
-                "Insurance Provider *",
-                options=["Select your insurance..."] + data_gen.insurance_providers,
-                help="Select your insurance provider from the list"
-            )
             
-            member_id = st.text_input(
-                "Member ID *",
-                placeholder="ABC12345678",
-                help="Your insurance member ID (usually found on your insurance card)"
-            )
+            with col_load:
+                load_slots = st.form_submit_button("🔍 Load Available Slots", use_container_width=True)
         
-        with col6:
-            group_number = st.text_input(
-                "Group Number",
-                placeholder="GRP1234 (if applicable)",
-                help="Group number from your insurance card (leave blank if not applicable)"
-            )
+        if load_slots:
+            st.session_state.selected_doctor = None if doctor_choice == "Select a doctor..." else doctor_choice
         
-        # Form submission
-        st.markdown("---")
-        submit_button = st.form_submit_button(
-            "📅 Schedule My Appointment",
-            type="primary",
-            use_container_width=True
-        )
+        preferred_doctor = st.session_state.selected_doctor
         
-        # Form validation and processing
-        if submit_button:
-            # Validate required fields
-            errors = []
+        with st.form("appointment_form"):
+            # Personal Information Section
+            st.subheader("📋 Personal Information")
+            
+            col1, col2 = st.columns(2)
             
-            if not full_name or len(full_name.strip()) < 2:
-                errors.append("Please enter your full name")
+            with col1:
+                full_name = st.text_input(
+                    "Full Name *",
+                    placeholder="Enter your full name (e.g., John Smith)",
+                    help="Please enter your first and last name as it appears on your ID"
+                )
+                
+                phone = st.text_input(
+                    "Phone Number *",
+                    placeholder="+91 - 98765 43210",
+                    help="Enter your phone number in Indian format for SMS confirmations and reminders"
+                )
+            
+            with col2:
+                dob = st.date_input(
+                    "Date of Birth *",
+                    min_value=datetime(1920, 1, 1),
+                    max_value=datetime.now(),
+                    help="Your date of birth helps us locate your medical records"
+                )
+                
+                email = st.text_input(
+                    "Email Address *",
+                    placeholder="john.smith@email.com",
+                    help="Email address for appointment confirmations and forms"
+                )
             
-            if not phone:
-                errors.append("Please enter your phone number")
+            # Appointment Details Section
+            st.subheader("👨‍⚕️ Appointment Details")
             
-            if not email or '@' not in email:
-                errors.append("Please enter a valid email address")
+            col3, col4 = st.columns(2)
             
-            if preferred_doctor == "Select a doctor...":
-                errors.append("Please select a preferred doctor")
+            # Time slot selection (populated once a doctor's slots have been loaded)
+            slots_by_display = {}
+            with col3:
+                if preferred_doctor:
+                    with st.spinner(f"Loading available slots for {preferred_doctor}..."):
+                        available_slots = get_cached_slots(preferred_doctor)
+                    
+                    if available_slots:
+                        slots_by_display = {slot['display']: slot for slot in available_slots}
+                        time_slot_options = ["Select a time slot...", *slots_by_display]
+                        selected_time_slot = st.selectbox(
+                            f"Available Time Slots with {preferred_doctor} *",
+                            options=time_slot_options,
+                            help="Choose your preferred appointment time from available slots"
+                        )
+                    else:
+                        st.warning(f"No available slots found for {preferred_doctor}. Please try another doctor.")
+                        selected_time_slot = "Select a time slot..."
+                else:
+                    st.info("Please choose a doctor and load their available slots first.")
+                    selected_time_slot = "Select a time slot..."
             
-            if 'selected_time_slot' in locals() and selected_time_slot == "Select a time slot...":
-                errors.append("Please select an appointment time slot")
+            with col4:
+                appointment_reason = st.text_area(
+                    "Reason for Visit (Optional)",
+                    placeholder="Brief description of your symptoms or reason for the appointment",
+                    max_chars=200,
+                    help="Optional: Help us prepare for your visit by describing your symptoms or concerns"
+                )
             
-            if insurance_provider == "Select your insurance...":
-                errors.append("Please select your insurance provider")
+            # Insurance Information Section
+            st.subheader("🏥 Insurance Information")
             
-            if not member_id:
-                errors.append("Please enter your insurance member ID")
+            col5, col6 = st.columns(2)
             
-            # Display errors or process form
-            if errors:
-                st.error("Please correct the following errors:")
-                for error in errors:
-                    st.error(f"• {error}")
-            else:
-                # Get selected slot details
-                selected_slot = None
-                if 'selected_time_slot' in locals() and selected_time_slot != "Select a time slot...":
-                    available_slots = scheduling_agent.get_available_slots(preferred_doctor)
-                    for slot in available_slots:
-                        if slot['display'] == selected_time_slot:
-                            selected_slot = slot
-                            break
+            with col5:
+                insurance_provider = st.selectbox(
+                    "Insurance Provider *",
+                    options=INSURANCE_OPTIONS,
+                    help="Select your insurance provider from the list"
+                )
                 
-                # Process the appointment booking
-                process_appointment_form(
-                    full_name, dob, phone, email, preferred_doctor,
-                    selected_slot, insurance_provider, member_id, group_number,
-                    appointment_reason, patient_mgr, excel_mgr, 
-                    scheduling_agent, notification_agent
+                member_id = st.text_input(
+                    "Member ID *",
+                    placeholder="ABC12345678",
+                    help="Your insurance member ID (usually found on your insurance card)"
                 )
-    
-    # Show form tips
-    with st.expander("💡 Form Tips"):
-        st.markdown("""
-        **Required fields are marked with ***
+            
+            with col6:
+                group_number = st.text_input(
+                    "Group Number",
+                    placeholder="GRP1234 (if applicable)",
+                    help="Group number from your insurance card (leave blank if not applicable)"
+                )
+            
+            # Form submission
+            st.markdown("---")
+            submit_button = st.form_submit_button(
+                "📅 Schedule My Appointment",
+                type="primary",
+                use_container_width=True
+            )
+            
+            # Form validation and processing
+            if submit_button:
+                # Validate required fields
+                errors = []
+                
+                full_name = full_name.strip()
+                if len(full_name) < 2:
+                    errors.append("Please enter your full name")
+                
+                if not phone:
+                    errors.append("Please enter your phone number")
+                
+                if not email or '@' not in email:
+                    errors.append("Please enter a valid email address")
+                
+                if not preferred_doctor:
+                    errors.append("Please select a preferred doctor")
+                
+                if 'selected_time_slot' in locals() and selected_time_slot == "Select a time slot...":
+                    errors.append("Please select an appointment time slot")
+                
+                if insurance_provider == "Select your insurance...":
+                    errors.append("Please select your insurance provider")
+                
+                if not member_id:
+                    errors.append("Please enter your insurance member ID")
+                
+                # Display errors or process form
+                if errors:
+                    st.error("Please correct the following errors:")
+                    for error in errors:
+                        st.error(f"• {error}")
+                else:
+                    # Get selected slot details
+                    selected_slot = slots_by_display.get(selected_time_slot)
+                    
+                    # Process the appointment booking
+                    booked = process_appointment_form(
+                        full_name, dob, phone, email, preferred_doctor,
+                        selected_slot, insurance_provider, member_id, group_number,
+                        appointment_reason, patient_mgr, excel_mgr, 
+                        scheduling_agent, notification_agent
+                    )
         
-        **Tips for filling out the form:**
-        - **Full Name**: Use your legal name as it appears on your ID
-        - **Phone**: Use your primary phone number for text reminders
-        - **Email**: Check your email after booking for confirmation and forms
-        - **Doctor**: All our doctors are experienced general practitioners
-        - **Insurance**: Make sure to have your insurance card handy for accurate information
-        - **Member ID**: Usually a combination of letters and numbers on your insurance card
-        - **Group Number**: Not all insurance plans have group numbers - leave blank if not applicable
-        """)
+        # Show form tips
+        with st.expander("💡 Form Tips"):
+            st.markdown("""
+            **Required fields are marked with ***
+            
+            **Tips for filling out the form:**
+            - **Full Name**: Use your legal name as it appears on your ID
+            - **Phone**: Use your primary phone number for text reminders
+            - **Email**: Check your email after booking for confirmation and forms
+            - **Doctor**: All our doctors are experienced general practitioners
+            - **Insurance**: Make sure to have your insurance card handy for accurate information
+            - **Member ID**: Usually a combination of letters and numbers on your insurance card
+            - **Group Number**: Not all insurance plans have group numbers - leave blank if not applicable
+            """)
+    
+    if booked:
+        booking_page.empty()
+        display_appointment_confirmation()
 
 def display_appointments_page(excel_mgr):
     """Display all appointments page"""
     st.header("📅 All Appointments")
     
-    if os.path.exists('appointments.xlsx'):
-        appointments_df = pd.read_excel('appointments.xlsx')
-        
+    try:
+        appointments_df = load_appointments(os.path.getmtime(excel_mgr.db_file))
+    except FileNotFoundError:
+        appointments_df = None
+    
+    if appointments_df is not None:
         if not appointments_df.empty:
             st.success(f"Found {len(appointments_df)} appointments")
             
@@ -332,12 +392,11 @@ def display_appointments_page(excel_mgr):
                     help="Filter appointments by their status"
                 )
             
-            # Apply filters
-            filtered_df = appointments_df.copy()
+            # Apply filters (st.cache_data hands back a fresh copy on every call)
+            filtered_df = appointments_df
             
             if date_filter:
-                filtered_df['Date_Parsed'] = pd.to_datetime(filtered_df['Date'], errors='coerce')
-                filtered_df = filtered_df[filtered_df['Date_Parsed'].dt.date == date_filter]
+                filtered_df = filtered_df[filtered_df['Date'].dt.date == date_filter]
             
             if status_filter != "All":
                 filtered_df = filtered_df[filtered_df['Status'] == status_filter]
@@ -358,36 +417,38 @@ def display_appointments_page(excel_mgr):
                 st.dataframe(
                     filtered_df[available_columns],
                     use_container_width=True,
-                    hide_index=True
+                    hide_index=True,
+                    column_config={"Date": st.column_config.DateColumn("Date", format="dddd, MMMM DD, YYYY")}
                 )
                 
-                # Show statistics
+                # Show statistics (counted with boolean sums instead of building a sub-frame per metric)
                 st.markdown("---")
+                counts = {
+                    'total': len(filtered_df),
+                    'new': int((filtered_df['Patient_Type'] == 'New').sum()),
+                    'confirmed': int((filtered_df['Status'] == 'Confirmed').sum()),
+                    'today': int((filtered_df['Date'].dt.date == datetime.now().date()).sum())
+                }
+                
                 col_stat1, col_stat2, col_stat3, col_stat4 = st.columns(4)
                 
                 with col_stat1:
-                    st.metric("Total Appointments", len(filtered_df))
+                    st.metric("Total Appointments", counts['total'])
                 
                 with col_stat2:
-                    new_patients = len(filtered_df[filtered_df['Patient_Type'] == 'New'])
-                    st.metric("New Patients", new_patients)
+                    st.metric("New Patients", counts['new'])
                 
                 with col_stat3:
-                    confirmed = len(filtered_df[filtered_df['Status'] == 'Confirmed'])
-                    st.metric("Confirmed", confirmed)
+                    st.metric("Confirmed", counts['confirmed'])
                 
                 with col_stat4:
-                    today_appointments = 0
-                    if 'Date_Parsed' in filtered_df.columns.tolist():
-                        today = datetime.now().date()
-                        today_appointments = len(filtered_df[pd.to_datetime(filtered_df['Date_Parsed']).dt.date == today])
-                    st.metric("Today's Appointments", today_appointments)
+                    st.metric("Today's Appointments", counts['today'])
             else:
                 st.info("No appointments match the selected filters.")
         else:
             st.info("📅 No appointments have been booked yet.")
     else:
-        st.warning("⚠️ Appointments file not found. Please make sure the system is properly initialized.")
+        st.warning("⚠️ Appointments database not found. Please make sure the system is properly initialized.")
     
     # Add refresh button
     if st.button("🔄 Refresh Data", use_container_width=True):
@@ -397,7 +458,7 @@ def process_appointment_form(full_name, dob, phone, email, preferred_doctor,
                            selected_slot, insurance_provider, member_id, group_number, 
                            appointment_reason, patient_mgr, excel_mgr, 
                            scheduling_agent, notification_agent):
-    """Process the appointment form submission"""
+    """Process the appointment form submission (full_name arrives already stripped); returns True once booked"""
     
     with st.spinner("Processing your appointment request..."):
         try:
@@ -410,7 +471,7 @@ def process_appointment_form(full_name, dob, phone, email, preferred_doctor,
             
             # Prepare patient data dictionary
             st.session_state.patient_data = {
-                'name': full_name.strip(),
+                'name': full_name,
                 'dob': dob_str,
                 'phone': phone.strip(),
                 'email': email.strip().lower(),
@@ -442,20 +503,29 @@ def process_appointment_form(full_name, dob, phone, email, preferred_doctor,
                 st.session_state.patient_data['appointment_id'] = appointment_id
                 
                 if appointment_id:
-                    # Send confirmations
-                    email_sent = notification_agent.send_email_confirmation(st.session_state.patient_data)
-                    sms_sent = notification_agent.send_sms_confirmation(st.session_state.patient_data)
+                    # The booked slot is no longer available
+                    get_cached_slots.clear()
+                    load_appointments.clear()
                     
-                    # Schedule reminders
-                    notification_agent.schedule_reminders(st.session_state.patient_data)
+                    # Send confirmations and schedule reminders; these are independent
+                    # network calls, so run them side by side instead of one after another
+                    patient_data = st.session_state.patient_data
+                    with ThreadPoolExecutor(max_workers=3) as executor:
+                        notifications = [
+                            executor.submit(notification_agent.send_email_confirmation, patient_data),
+                            executor.submit(notification_agent.send_sms_confirmation, patient_data),
+                            executor.submit(notification_agent.schedule_reminders, patient_data)
+                        ]
+                    email_sent, sms_sent, _ = (future.result() for future in notifications)
                     
                     # Mark as successfully booked
                     st.session_state.appointment_booked = True
                     st.session_state.form_submitted = True
                     
-                    st.success("✅ Appointment successfully booked!")
-                    st.rerun()
+                    return True
                 else:
+                    # The slot may have been taken meanwhile; retry from fresh slots
+                    get_cached_slots.clear()
                     st.error("❌ Error booking appointment. Please try again.")
             else:
                 st.error(f"❌ No available slots found for {preferred_doctor}. Please try selecting a different doctor or contact us at (555) 123-4567.")
@@ -463,6 +533,8 @@ def process_appointment_form(full_name, dob, phone, email, preferred_doctor,
         except Exception as e:
             st.error(f"❌ An error occurred while booking your appointment: {str(e)}")
             print(f"Error in process_appointment_form: {e}")
+    
+    return False
 
 def display_appointment_confirmation():
     """Display the appointment confirmation page"""
@@ -566,6 +638,7 @@ def display_appointment_confirmation():
             st.session_state.patient_data = {}
             st.session_state.form_submitted = False
             st.session_state.appointment_booked = False
+            st.session_state.selected_doctor = None
             st.rerun()
 
 if __name__ == "__main__":
@@ -1,59 +1,93 @@
 import pandas as pd
+import numpy as np
 import random
 from datetime import datetime, timedelta
 from faker import Faker
 import os
+import threading
+
+from utils.excel_manager import EXCEL_WRITE_ENGINE
+
+DOCTORS = ("Dr. Smith", "Dr. Johnson", "Dr. Williams")
+INSURANCE_PROVIDERS = (
+    "Blue Cross Blue Shield", "Aetna", "Cigna", "Humana", 
+    "United Healthcare", "Kaiser Permanente", "Medicare", "Medicaid"
+)
+
+PATIENT_COLUMNS = [
+    'patient_id', 'name', 'DOB', 'phone', 'email',
+    'insurance_provider', 'member_id', 'group_number', 'visit_history'
+]
 
 class DataGenerator:
     """Generate synthetic data for patients and doctor schedules"""
     
+    # Next free patient number, shared by every instance in the process
+    _next_patient_number = None
+    _patient_id_lock = threading.Lock()
+    
     def __init__(self):
         self.fake = Faker()
-        self.doctors = ["Dr. Smith", "Dr. Johnson", "Dr. Williams"]
-        self.insurance_providers = [
-            "Blue Cross Blue Shield", "Aetna", "Cigna", "Humana", 
-            "United Healthcare", "Kaiser Permanente", "Medicare", "Medicaid"
-        ]
+        self.doctors = list(DOCTORS)
+        self.insurance_providers = list(INSURANCE_PROVIDERS)
+        self.member_id_prefixes = ['ABC', 'DEF', 'GHI', 'JKL', 'MNO', 'PQR', 'STU', 'VWX', 'YZ1', 'BC2']
     
     def generate_patients_csv(self, num_patients=50):
         """Generate synthetic patient data and save to CSV"""
-        patients = []
+        if num_patients == 0:
+            # The batched draws below can't handle empty batches; write just the header
+            df = pd.DataFrame(columns=PATIENT_COLUMNS)
+            df.to_csv('patients.csv', index=False)
+            DataGenerator._next_patient_number = 1000
+            print("Generated 0 synthetic patients in patients.csv")
+            return df
         
-        for i in range(num_patients):
-            # Generate visit history
-            num_visits = random.randint(0, 10)
-            visit_dates = []
-            for _ in range(num_visits):
-                visit_date = self.fake.date_between(start_date='-2y', end_date='today')
-                visit_dates.append(visit_date.strftime('%m/%d/%Y'))
-            
-            visit_history = '; '.join(visit_dates) if visit_dates else 'New Patient'
-            
-            patient = {
-                'patient_id': f"PAT{1000 + i}",
-                'name': self.fake.name(),
-                'DOB': self.fake.date_of_birth(minimum_age=18, maximum_age=85).strftime('%m/%d/%Y'),
-                'phone': self.fake.phone_number(),
-                'email': self.fake.email(),
-                'insurance_provider': random.choice(self.insurance_providers),
-                'member_id': self.generate_member_id(),
-                'group_number': self.generate_group_number(),
-                'visit_history': visit_history
-            }
-            
-            patients.append(patient)
+        rng = np.random.default_rng()
+        today = pd.Timestamp.today().normalize()
+        
+        # Visit history: draw and format every visit date from the last 2 years
+        # in one batch, then split the batch per patient
+        visit_counts = rng.integers(0, 11, num_patients)
+        visit_offsets = rng.integers(0, 2 * 365 + 1, int(visit_counts.sum()))
+        visit_dates = (today - pd.to_timedelta(visit_offsets, unit='D')).strftime('%m/%d/%Y').to_numpy()
+        visit_histories = [
+            '; '.join(dates) if len(dates) else 'New Patient'
+            for dates in np.split(visit_dates, np.cumsum(visit_counts)[:-1])
+        ]
+        
+        # Member IDs: random prefix followed by 8 zero-padded digits
+        prefixes = np.array(self.member_id_prefixes)
+        member_ids = np.char.add(
+            prefixes[rng.integers(0, len(prefixes), num_patients)],
+            np.char.zfill(rng.integers(0, 10**8, num_patients).astype('U8'), 8)
+        )
         
-        # Create DataFrame and save to CSV
-        df = pd.DataFrame(patients)
+        # Dates of birth for ages 18-85, drawn as day offsets from today
+        birth_dates = today - pd.to_timedelta(rng.integers(18 * 365, 86 * 365, num_patients), unit='D')
+        
+        # Faker is only used for the fields that need realistic text
+        df = pd.DataFrame({
+            'patient_id': [f"PAT{1000 + i}" for i in range(num_patients)],
+            'name': [self.fake.name() for _ in range(num_patients)],
+            'DOB': birth_dates.strftime('%m/%d/%Y'),
+            'phone': [self.fake.phone_number() for _ in range(num_patients)],
+            'email': [self.fake.email() for _ in range(num_patients)],
+            'insurance_provider': rng.choice(self.insurance_providers, num_patients),
+            'member_id': member_ids,
+            'group_number': [self.generate_group_number() for _ in range(num_patients)],
+            'visit_history': visit_histories
+        })
+        
+        # Save to CSV
         df.to_csv('patients.csv', index=False)
+        DataGenerator._next_patient_number = 1000 + num_patients
         print(f"Generated {num_patients} synthetic patients in patients.csv")
         
         return df
     
     def generate_member_id(self):
         """Generate realistic member ID"""
-        prefixes = ['ABC', 'DEF', 'GHI', 'JKL', 'MNO', 'PQR', 'STU', 'VWX', 'YZ1', 'BC2']
-        prefix = random.choice(prefixes)
+        prefix = random.choice(self.member_id_prefixes)
         numbers = ''.join([str(random.randint(0, 9)) for _ in range(8)])
         return f"{prefix}{numbers}"
     
@@ -72,8 +106,6 @@ class DataGenerator:
     
     def generate_doctor_schedule(self):
         """Generate doctor schedule for 5 working days"""
-        schedule_data = []
-        
         # Generate for next 5 working days
         start_date = datetime.now().date()
         working_days = []
@@ -84,74 +116,79 @@ class DataGenerator:
                 working_days.append(current_date)
             current_date += timedelta(days=1)
         
-        slot_id = 1000
+        # Each doctor works 9 AM to 5 PM with 30-minute slots
+        times = [f"{hour:02d}:{minute:02d}" for hour in range(9, 17) for minute in (0, 30)]
+        df = pd.MultiIndex.from_product(
+            [self.doctors, working_days, times], names=['Doctor', 'Date', 'Time']
+        ).to_frame(index=False)
         
-        for doctor in self.doctors:
-            for date in working_days:
-                # Each doctor works 9 AM to 5 PM with 30-minute slots
-                for hour in range(9, 17):
-                    for minute in [0, 30]:
-                        time_str = f"{hour:02d}:{minute:02d}"
-                        
-                        # Randomly make some slots unavailable (booked)
-                        is_available = random.random() > 0.3  # 70% availability
-                        
-                        schedule_entry = {
-                            'Slot_ID': f"SLOT_{slot_id}",
-                            'Doctor': doctor,
-                            'Date': date,
-                            'Time': time_str,
-                            'Available': is_available,
-                            'Duration_Minutes': 30,
-                            'Patient_Name': '' if is_available else self.fake.name(),
-                            'Notes': '' if is_available else 'Booked'
-                        }
-                        
-                        schedule_data.append(schedule_entry)
-                        slot_id += 1
+        # Randomly make some slots unavailable (booked)
+        rng = np.random.default_rng()
+        is_available = rng.random(len(df)) > 0.3  # 70% availability
+        patient_names = np.full(len(df), '', dtype=object)
+        patient_names[~is_available] = [self.fake.name() for _ in range(int((~is_available).sum()))]
         
-        # Create DataFrame and save to Excel
-        df = pd.DataFrame(schedule_data)
-        df.to_excel('doctor_schedule.xlsx', index=False, engine='openpyxl')
+        df.insert(0, 'Slot_ID', [f"SLOT_{slot_id}" for slot_id in range(1000, 1000 + len(df))])
+        df['Available'] = is_available
+        df['Duration_Minutes'] = 30
+        df['Patient_Name'] = patient_names
+        df['Notes'] = np.where(is_available, '', 'Booked')
+        
+        # Save to Excel
+        df.to_excel('doctor_schedule.xlsx', index=False, engine=EXCEL_WRITE_ENGINE)
         print(f"Generated doctor schedule in doctor_schedule.xlsx")
         
         return df
     
     def update_patient_csv_with_new_patient(self, patient_data):
         """Add new patient to the CSV file"""
+        new_ids = self.add_patient_bulk([patient_data])
+        return new_ids[0] if new_ids else None
+    
+    def add_patient_bulk(self, patients_data):
+        """Add several new patients to the CSV file with a single append"""
         try:
-            # Load existing patients
-            if os.path.exists('patients.csv'):
-                df = pd.read_csv('patients.csv')
-            else:
-                df = pd.DataFrame()
+            if not patients_data:
+                return []
             
-            # Generate new patient ID
-            if len(df) > 0:
-                last_id = int(df['patient_id'].str.replace('PAT', '').max())
-                new_id = f"PAT{last_id + 1}"
-            else:
-                new_id = "PAT1000"
+            # Collect the new records first and build one DataFrame from them
+            new_patients = [
+                {
+                    'patient_id': self.next_patient_id(),
+                    'name': patient_data['name'],
+                    'DOB': patient_data['dob'],
+                    'phone': patient_data.get('phone', ''),
+                    'email': patient_data.get('email', ''),
+                    'insurance_provider': patient_data.get('carrier', ''),
+                    'member_id': patient_data.get('member_id', ''),
+                    'group_number': patient_data.get('group_number', ''),
+                    'visit_history': 'New Patient'
+                }
+                for patient_data in patients_data
+            ]
             
-            # Create new patient record
-            new_patient = {
-                'patient_id': new_id,
-                'name': patient_data['name'],
-                'DOB': patient_data['dob'],
-                'phone': patient_data.get('phone', ''),
-                'email': patient_data.get('email', ''),
-                'insurance_provider': patient_data.get('carrier', ''),
-                'member_id': patient_data.get('member_id', ''),
-                'group_number': patient_data.get('group_number', ''),
-                'visit_history': 'New Patient'
-            }
+            # Append only the new rows instead of rewriting the whole file
+            write_header = not os.path.exists('patients.csv') or os.path.getsize('patients.csv') == 0
+            pd.DataFrame(new_patients).to_csv('patients.csv', mode='a', header=write_header, index=False)
             
-            # Add new patient and save
-            df = pd.concat([df, pd.DataFrame([new_patient])], ignore_index=True)
-            df.to_csv('patients.csv', index=False)
-            
-            return new_id
+            return [patient['patient_id'] for patient in new_patients]
             
         except Exception as e:
             print(f"Error updating patient CSV: {e}")
-            return None
+            return []
+    
+    def next_patient_id(self):
+        """Allocate the next patient ID, scanning patients.csv only once per process"""
+        with DataGenerator._patient_id_lock:
+            if DataGenerator._next_patient_number is None:
+                if os.path.exists('patients.csv') and os.path.getsize('patients.csv') > 0:
+                    # Only the ID column is needed, so skip parsing and type inference for the rest
+                    df = pd.read_csv('patients.csv', usecols=['patient_id'], dtype={'patient_id': 'string'})
+                    ids = df['patient_id'].str.replace('PAT', '').astype(int)
+                    DataGenerator._next_patient_number = int(ids.max()) + 1 if len(ids) > 0 else 1000
+                else:
+                    DataGenerator._next_patient_number = 1000
+            
+            new_id = f"PAT{DataGenerator._next_patient_number}"
+            DataGenerator._next_patient_number += 1
+            return new_id
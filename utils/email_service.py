@@ -1,9 +1,15 @@
 import smtplib
 import os
+import atexit
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email import encoders
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.base import MIMEBase
-from email import encoders
+
+logger = logging.getLogger(__name__)
 
 class EmailService:
     """Service for sending emails via SMTP"""
@@ -17,34 +23,183 @@ class EmailService:
         
         # Check if real email credentials are provided
         self.mock_mode = not all([self.email_address != 'noreply@medicalcenter.com', self.email_password != 'your_app_password_here'])
+        
+        # Mock sends are logged at DEBUG with the body cut to this many characters
+        self.mock_preview_chars = 100
+        
+        # One SMTP session is reused across sends and recycled periodically
+        self.max_messages_per_connection = 1000
+        self._smtp = None
+        self._sent = 0
+        self._lock = threading.Lock()
+        
+        if not self.mock_mode:
+            atexit.register(self.close)
     
-    def send_email(self, to_email, subject, body):
-        """Send a simple text email"""
+    def _mock_send(self, label, to_email, subject, body, body_label='Body', attachment_path=None):
+        """Log a send in mock mode instead of building and sending a message"""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[%s] To: %s", label, to_email)
+            logger.debug("[%s] Subject: %s", label, subject)
+            if attachment_path is not None:
+                logger.debug("[%s] Attachment: %s", label, attachment_path)
+            logger.debug("[%s] %s: %s...", label, body_label, body[:self.mock_preview_chars])
+        return True
+    
+    def _open_conn(self):
+        """Open a new SMTP session and log in"""
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=30)
         try:
-            if self.mock_mode:
-                print(f"[MOCK EMAIL] To: {to_email}")
-                print(f"[MOCK EMAIL] Subject: {subject}")
-                print(f"[MOCK EMAIL] Body: {body[:100]}...")
-                return True
-            
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = self.email_address
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            # Add body to email
-            msg.attach(MIMEText(body, 'plain'))
-            
-            # Create SMTP session
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
             server.starttls()  # Enable security
             server.login(self.email_address, self.email_password)
-            
-            # Send email
-            text = msg.as_string()
-            server.sendmail(self.email_address, to_email, text)
+        except Exception:
+            server.close()
+            raise
+        return server
+    
+    def _quit(self, server):
+        """Quit an SMTP session, ignoring a server that already hung up"""
+        try:
             server.quit()
+        except Exception:
+            server.close()
+    
+    def _get_conn(self):
+        """Return the open SMTP session, logging in on first use"""
+        if self._smtp is not None and self._sent >= self.max_messages_per_connection:
+            self._close_conn()
+        
+        if self._smtp is None:
+            self._smtp = self._open_conn()
+            self._sent = 0
+        
+        return self._smtp
+    
+    def _close_conn(self):
+        """Quit the current SMTP session"""
+        server, self._smtp = self._smtp, None
+        if server is not None:
+            self._quit(server)
+    
+    def _send_msg(self, msg, to_email):
+        """Send a message over the shared session, reconnecting once if it dropped"""
+        text = msg.as_string()
+        
+        with self._lock:
+            try:
+                self._get_conn().sendmail(self.email_address, to_email, text)
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                self._close_conn()
+                self._get_conn().sendmail(self.email_address, to_email, text)
+            except Exception:
+                self._close_conn()
+                raise
+            self._sent += 1
+    
+    def _send_batch(self, batch):
+        """Send (index, message, recipient) items over one dedicated SMTP session"""
+        results = {}
+        server = None
+        
+        for index, msg, to_email in batch:
+            text = msg.as_string()
+            for attempt in range(2):
+                try:
+                    if server is None:
+                        server = self._open_conn()
+                    server.sendmail(self.email_address, to_email, text)
+                    results[index] = True
+                    break
+                except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+                    # Reconnect once; a second failure gives up on this message
+                    server = None
+                    if attempt:
+                        logger.error("Error sending email to %s: %s", to_email, e)
+                        results[index] = False
+                except Exception as e:
+                    logger.error("Error sending email to %s: %s", to_email, e)
+                    results[index] = False
+                    break
+        
+        if server is not None:
+            self._quit(server)
+        
+        return results
+    
+    def send_many(self, emails, max_connections=10):
+        """Send many (to_email, subject, body) text emails in parallel; returns a success flag per email"""
+        if self.mock_mode or len(emails) <= 1:
+            return [self.send_email(to_email, subject, body) for to_email, subject, body in emails]
+        
+        # Spread the messages over a fixed number of sessions, each owned by one thread
+        items = [
+            (index, self._build_message(to_email, subject, [MIMEText(body, 'plain')]), to_email)
+            for index, (to_email, subject, body) in enumerate(emails)
+        ]
+        workers = min(max_connections, len(items))
+        batches = [items[start::workers] for start in range(workers)]
+        
+        results = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for batch_results in executor.map(self._send_batch, batches):
+                results.update(batch_results)
+        
+        sent = sum(results.values())
+        logger.info("Sent %d of %d emails", sent, len(emails))
+        return [results[index] for index in range(len(emails))]
+    
+    def _build_message(self, to_email, subject, parts, attachment=None):
+        """Assemble a MIME message from body parts and an optional attachment part"""
+        msg = MIMEMultipart('mixed' if attachment is not None else 'alternative')
+        msg['From'] = self.email_address
+        msg['To'] = to_email
+        msg['Subject'] = subject
+        
+        for part in parts:
+            msg.attach(part)
+        
+        if attachment is not None:
+            msg.attach(attachment)
+        
+        return msg
+    
+    def _build_attachment(self, attachment_path):
+        """Build a base64 attachment part, or None if the file is missing"""
+        if not os.path.exists(attachment_path):
+            return None
+        
+        # Create MIMEBase object
+        part = MIMEBase('application', 'octet-stream')
+        with open(attachment_path, "rb") as attachment:
+            part.set_payload(attachment.read())
+        
+        # Encode file in ASCII characters to send by email
+        encoders.encode_base64(part)
+        
+        # Add header as key/value pair to attachment part
+        filename = os.path.basename(attachment_path)
+        part.add_header(
+            'Content-Disposition',
+            f'attachment; filename= {filename}',
+        )
+        
+        return part
+    
+    def close(self):
+        """Close the shared SMTP session"""
+        with self._lock:
+            self._close_conn()
+    
+    def send_email(self, to_email, subject, body):
+        """Send a simple text email"""
+        if self.mock_mode:
+            return self._mock_send('MOCK EMAIL', to_email, subject, body)
+        
+        try:
+            msg = self._build_message(to_email, subject, [MIMEText(body, 'plain')])
+            
+            # Send email over the shared SMTP session
+            self._send_msg(msg, to_email)
             
             print(f"Email sent successfully to {to_email}")
             return True
@@ -55,52 +210,17 @@ class EmailService:
     
     def send_email_with_attachment(self, to_email, subject, body, attachment_path):
         """Send email with attachment"""
+        if self.mock_mode:
+            return self._mock_send('MOCK EMAIL WITH ATTACHMENT', to_email, subject, body,
+                                   attachment_path=attachment_path)
+        
         try:
-            if self.mock_mode:
-                print(f"[MOCK EMAIL WITH ATTACHMENT] To: {to_email}")
-                print(f"[MOCK EMAIL WITH ATTACHMENT] Subject: {subject}")
-                print(f"[MOCK EMAIL WITH ATTACHMENT] Attachment: {attachment_path}")
-                print(f"[MOCK EMAIL WITH ATTACHMENT] Body: {body[:100]}...")
-                return True
-            
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = self.email_address
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            # Add body to email
-            msg.attach(MIMEText(body, 'plain'))
-            
             # Add attachment if file exists
-            if os.path.exists(attachment_path):
-                with open(attachment_path, "rb") as attachment:
-                    # Create MIMEBase object
-                    part = MIMEBase('application', 'octet-stream')
-                    part.set_payload(attachment.read())
-                
-                # Encode file in ASCII characters to send by email    
-                encoders.encode_base64(part)
-                
-                # Add header as key/value pair to attachment part
-                filename = os.path.basename(attachment_path)
-                part.add_header(
-                    'Content-Disposition',
-                    f'attachment; filename= {filename}',
-                )
-                
-                # Attach the part to message
-                msg.attach(part)
-            
-            # Create SMTP session
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()  # Enable security
-            server.login(self.email_address, self.email_password)
+            msg = self._build_message(to_email, subject, [MIMEText(body, 'plain')],
+                                      attachment=self._build_attachment(attachment_path))
             
-            # Send email
-            text = msg.as_string()
-            server.sendmail(self.email_address, to_email, text)
-            server.quit()
+            # Send email over the shared SMTP session
+            self._send_msg(msg, to_email)
             
             print(f"Email with attachment sent successfully to {to_email}")
             return True
@@ -111,32 +231,14 @@ class EmailService:
     
     def send_html_email(self, to_email, subject, html_body):
         """Send HTML formatted email"""
+        if self.mock_mode:
+            return self._mock_send('MOCK HTML EMAIL', to_email, subject, html_body, body_label='HTML Body')
+        
         try:
-            if self.mock_mode:
-                print(f"[MOCK HTML EMAIL] To: {to_email}")
-                print(f"[MOCK HTML EMAIL] Subject: {subject}")
-                print(f"[MOCK HTML EMAIL] HTML Body: {html_body[:100]}...")
-                return True
-            
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['From'] = self.email_address
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            # Create HTML part
-            html_part = MIMEText(html_body, 'html')
-            msg.attach(html_part)
-            
-            # Create SMTP session
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()  # Enable security
-            server.login(self.email_address, self.email_password)
+            msg = self._build_message(to_email, subject, [MIMEText(html_body, 'html')])
             
-            # Send email
-            text = msg.as_string()
-            server.sendmail(self.email_address, to_email, text)
-            server.quit()
+            # Send email over the shared SMTP session
+            self._send_msg(msg, to_email)
             
             print(f"HTML email sent successfully to {to_email}")
             return True
@@ -1,7 +1,194 @@
 import pandas as pd
 import os
+import re
+import importlib.util
+import sqlite3
+import threading
+import zipfile
+from contextlib import closing
 from datetime import datetime, timedelta
+from xml.sax.saxutils import escape, quoteattr
 import uuid
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+# Prefer the Rust calamine reader and the xlsxwriter writer when installed;
+# both are much faster than openpyxl for plain tabular sheets
+EXCEL_READ_ENGINE = 'calamine' if importlib.util.find_spec('python_calamine') else 'openpyxl'
+EXCEL_WRITE_ENGINE = 'xlsxwriter' if importlib.util.find_spec('xlsxwriter') else 'openpyxl'
+
+APPOINTMENT_COLUMNS = [
+    'Appointment_ID', 'Patient_Name', 'DOB', 'Phone', 'Email',
+    'Doctor', 'Date', 'Time', 'Duration_Minutes', 'Status',
+    'Insurance_Carrier', 'Member_ID', 'Group_Number',
+    'Patient_Type', 'Created_Date', 'Notes'
+]
+
+SCHEDULE_COLUMNS = [
+    'Slot_ID', 'Doctor', 'Date', 'Time', 'Available',
+    'Duration_Minutes', 'Patient_Name', 'Notes'
+]
+
+# Seconds a booking waits before the workbook snapshots are re-exported in the
+# background; bookings within the window share one export
+SNAPSHOT_EXPORT_DELAY = 2.0
+
+ADMIN_REPORT_COLUMNS = [
+    'Report_Date', 'Appointment_ID', 'Patient_Name', 'Doctor',
+    'Appointment_Date', 'Appointment_Time', 'Patient_Type',
+    'Insurance_Carrier', 'Status', 'Notes'
+]
+
+# Schedule columns -> keys of the slot dicts returned by get_available_slots
+SLOT_FIELDS = {
+    'Slot_ID': 'slot_id',
+    'Doctor': 'doctor',
+    'Date': 'date',
+    'Time': 'time',
+    'Duration_Minutes': 'duration'
+}
+
+# Fixed parts of a one-sheet workbook for _fast_xlsx_dump; only the sheet
+# data and the sheet name vary between files
+_XLSX_MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_XLSX_REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        f'<Relationship Id="rId1" Type="{_XLSX_REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        f'<Relationship Id="rId1" Type="{_XLSX_REL_NS}/worksheet" Target="worksheets/sheet1.xml"/>'
+        f'<Relationship Id="rId2" Type="{_XLSX_REL_NS}/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/styles.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<styleSheet xmlns="{_XLSX_MAIN_NS}">'
+        '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd hh:mm:ss"/></numFmts>'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    ),
+}
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<workbook xmlns="{_XLSX_MAIN_NS}" xmlns:r="{_XLSX_REL_NS}">'
+    '<sheets><sheet name={name} sheetId="1" r:id="rId1"/></sheets></workbook>'
+)
+_EXCEL_EPOCH = datetime(1899, 12, 30)
+_XML_ILLEGAL_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+def _xlsx_cell(ref, value):
+    """Render one sheet1.xml cell, or '' for a blank"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c r="{ref}"><v>{value!r}</v></c>'
+    if isinstance(value, datetime):
+        serial = (value.replace(tzinfo=None) - _EXCEL_EPOCH).total_seconds() / 86400
+        return f'<c r="{ref}" s="1"><v>{serial!r}</v></c>'
+    
+    text = escape(_XML_ILLEGAL_RE.sub('', str(value)))
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+def _fast_xlsx_dump(df, path, sheet_name='Sheet1'):
+    """Write a DataFrame to .xlsx by streaming the sheet XML straight into the zip"""
+    letters = [get_column_letter(i) for i in range(1, len(df.columns) + 1)]
+    rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+    
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name, xml in _XLSX_PARTS.items():
+            zf.writestr(name, xml)
+        zf.writestr('xl/workbook.xml', _XLSX_WORKBOOK.format(name=quoteattr(sheet_name)))
+        
+        # Inline strings keep each row self-contained, so nothing but the
+        # current row is held in memory while the sheet is written
+        with zf.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            sheet.write(f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<worksheet xmlns="{_XLSX_MAIN_NS}"><sheetData>'.encode())
+            header = ''.join(_xlsx_cell(f'{letter}1', str(column)) for letter, column in zip(letters, df.columns))
+            sheet.write(f'<row r="1">{header}</row>'.encode())
+            for row_number, row in enumerate(rows, start=2):
+                cells = ''.join(_xlsx_cell(f'{letter}{row_number}', value) for letter, value in zip(letters, row))
+                sheet.write(f'<row r="{row_number}">{cells}</row>'.encode())
+            sheet.write(b'</sheetData></worksheet>')
+
+# path -> (mtime, DataFrame) for workbooks this process has read or written
+_sheet_cache = {}
+
+def _read_excel(path):
+    """Read a workbook, reusing the parsed frame until the file changes (treat as read-only)"""
+    mtime = os.path.getmtime(path)
+    cached = _sheet_cache.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, pd.read_excel(path, engine=EXCEL_READ_ENGINE))
+        _sheet_cache[path] = cached
+    return cached[1]
+
+def _remember_excel(path, df):
+    """Record a frame just written to path so the next _read_excel skips the parse"""
+    _sheet_cache[path] = (os.path.getmtime(path), df)
+
+def _iso_date(value):
+    """Format a date, datetime or date string as YYYY-MM-DD"""
+    if not hasattr(value, 'strftime'):
+        value = pd.to_datetime(value)
+    return value.strftime('%Y-%m-%d')
+
+def _write_excel_streaming(df, path, sheet_name='Sheet1'):
+    """Write a DataFrame to .xlsx row by row with openpyxl's write-only mode"""
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(sheet_name)
+    worksheet.append(list(df.columns))
+    
+    # Blank out NaN/NaT so they are written as empty cells, as to_excel does
+    for row in df.astype(object).where(df.notna(), None).itertuples(index=False, name=None):
+        worksheet.append(row)
+    
+    workbook.save(path)
+
+def _write_excel_constant_memory(df, path, sheet_name='Sheet1'):
+    """Write a DataFrame with xlsxwriter's constant_memory mode, falling back to openpyxl"""
+    if EXCEL_WRITE_ENGINE != 'xlsxwriter':
+        _write_excel_streaming(df, path, sheet_name)
+        return
+    
+    import xlsxwriter
+    
+    # constant_memory flushes each row once a later row is started, so cells
+    # must be written row-major; DataFrame.to_excel writes column by column
+    workbook = xlsxwriter.Workbook(path, {
+        'constant_memory': True,
+        'default_date_format': 'yyyy-mm-dd hh:mm:ss'
+    })
+    worksheet = workbook.add_worksheet(sheet_name)
+    worksheet.write_row(0, 0, list(df.columns))
+    
+    for row_number, row in enumerate(df.astype(object).where(df.notna(), None).itertuples(index=False, name=None), start=1):
+        worksheet.write_row(row_number, 0, row)
+    
+    workbook.close()
 
 class ExcelManager:
     """Manage Excel operations for appointments and schedules"""
@@ -10,35 +197,172 @@ class ExcelManager:
         self.appointments_file = 'appointments.xlsx'
         self.schedule_file = 'doctor_schedule.xlsx'
         self.admin_report_file = 'admin_report.xlsx'
+        
+        # Appointments and the doctor schedule are stored in SQLite;
+        # appointments.xlsx and doctor_schedule.xlsx are snapshots re-exported
+        # in the background shortly after bookings
+        self.db_file = 'appointments.db'
+        self._schedule_loaded = False
+        self._schedule_mtime = None
+        self._export_lock = threading.Lock()
+        self._export_write_lock = threading.Lock()
+        self._export_timer = None
+        self._init_db()
     
-    def create_appointments_file(self):
-        """Create appointments.xlsx with proper structure"""
+    def _connect(self):
+        """Open a connection to the appointments database"""
+        return closing(sqlite3.connect(self.db_file))
+    
+    def _init_db(self):
+        """Create the appointments table, importing appointments.xlsx the first time"""
+        with self._connect() as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS appointments (
+                    Appointment_ID TEXT PRIMARY KEY,
+                    Patient_Name TEXT, DOB TEXT, Phone TEXT, Email TEXT,
+                    Doctor TEXT, Date TEXT, Time TEXT, Duration_Minutes INTEGER, Status TEXT,
+                    Insurance_Carrier TEXT, Member_ID TEXT, Group_Number TEXT,
+                    Patient_Type TEXT, Created_Date TEXT, Notes TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_appointments_date ON appointments (Date)")
+            
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS schedule (
+                    Slot_ID TEXT PRIMARY KEY,
+                    Doctor TEXT, Date TEXT, Time TEXT, Available INTEGER,
+                    Duration_Minutes INTEGER, Patient_Name TEXT, Notes TEXT
+                )
+            """)
+            # Only open slots are ever searched by doctor/date/time
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_schedule_open ON schedule (Doctor, Date, Time) "
+                "WHERE Available = 1"
+            )
+            # mtime of the doctor_schedule.xlsx the schedule table was last synced with
+            conn.execute("CREATE TABLE IF NOT EXISTS sync_state (Name TEXT PRIMARY KEY, Mtime REAL)")
+            
+            has_rows = conn.execute("SELECT 1 FROM appointments LIMIT 1").fetchone()
+            if not has_rows and os.path.exists(self.appointments_file):
+                df = pd.read_excel(self.appointments_file, engine=EXCEL_READ_ENGINE)
+                if not df.empty:
+                    # Dates are stored as ISO text so they sort and compare as strings
+                    df['Date'] = pd.to_datetime(df['Date'], errors='coerce', format='mixed').dt.strftime('%Y-%m-%d')
+                    df[APPOINTMENT_COLUMNS].to_sql('appointments', conn, if_exists='append', index=False)
+                    print(f"Imported {len(df)} appointments from {self.appointments_file}")
+        
+        self._load_schedule()
+    
+    def _load_schedule(self):
+        """Sync the schedule table from doctor_schedule.xlsx when the workbook has changed"""
+        mtime = os.path.getmtime(self.schedule_file) if os.path.exists(self.schedule_file) else None
+        if self._schedule_loaded and mtime == self._schedule_mtime:
+            return True
+        
+        with self._connect() as conn, conn:
+            row = conn.execute("SELECT Mtime FROM sync_state WHERE Name = 'schedule'").fetchone()
+            has_rows = conn.execute("SELECT 1 FROM schedule LIMIT 1").fetchone()
+            
+            if mtime is not None and has_rows and row is None:
+                # Database from before the sync was tracked: adopt the workbook as-is
+                self._record_schedule_mtime(conn, mtime)
+            elif mtime is not None and (row is None or row[0] != mtime):
+                # New or regenerated workbook (e.g. DataGenerator.generate_doctor_schedule)
+                df = pd.read_excel(self.schedule_file, engine=EXCEL_READ_ENGINE)
+                df['Date'] = pd.to_datetime(df['Date'], errors='coerce', format='mixed').dt.strftime('%Y-%m-%d')
+                df['Available'] = df['Available'].astype(bool).astype(int)
+                conn.execute("DELETE FROM schedule")
+                conn.executemany(
+                    f"INSERT OR IGNORE INTO schedule ({', '.join(SCHEDULE_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(SCHEDULE_COLUMNS))})",
+                    df[SCHEDULE_COLUMNS].astype(object).where(df[SCHEDULE_COLUMNS].notna(), None).itertuples(index=False, name=None)
+                )
+                self._record_schedule_mtime(conn, mtime)
+                print(f"Imported {len(df)} slots from {self.schedule_file}")
+            
+            self._schedule_loaded = bool(mtime is not None or has_rows)
+        
+        self._schedule_mtime = mtime
+        return self._schedule_loaded
+    
+    def _record_schedule_mtime(self, conn, mtime):
+        """Remember which doctor_schedule.xlsx the schedule table matches"""
+        conn.execute(
+            "INSERT INTO sync_state (Name, Mtime) VALUES ('schedule', ?) "
+            "ON CONFLICT (Name) DO UPDATE SET Mtime = excluded.Mtime",
+            (mtime,)
+        )
+        self._schedule_mtime = mtime
+    
+    def get_appointments(self):
+        """Load all appointments from the database as a DataFrame"""
+        with self._connect() as conn:
+            return pd.read_sql("SELECT * FROM appointments ORDER BY rowid", conn, parse_dates=['Date'])
+    
+    def export_to_excel(self):
+        """Write a snapshot of the appointments table to appointments.xlsx"""
         try:
-            columns = [
-                'Appointment_ID', 'Patient_Name', 'DOB', 'Phone', 'Email',
-                'Doctor', 'Date', 'Time', 'Duration_Minutes', 'Status',
-                'Insurance_Carrier', 'Member_ID', 'Group_Number',
-                'Patient_Type', 'Created_Date', 'Notes'
-            ]
-            
-            df = pd.DataFrame(columns=columns)
-            df.to_excel(self.appointments_file, index=False, engine='openpyxl')
-            print(f"Created {self.appointments_file}")
+            _fast_xlsx_dump(self.get_appointments(), self.appointments_file)
+            return True
             
         except Exception as e:
-            print(f"Error creating appointments file: {e}")
+            print(f"Error exporting appointments: {e}")
+            return False
+    
+    def export_schedule_to_excel(self):
+        """Write a snapshot of the schedule table to doctor_schedule.xlsx"""
+        try:
+            if not self._load_schedule():
+                return False
+            
+            with self._connect() as conn:
+                df = pd.read_sql(
+                    f"SELECT {', '.join(SCHEDULE_COLUMNS)} FROM schedule ORDER BY rowid",
+                    conn, parse_dates=['Date']
+                )
+            df['Available'] = df['Available'].astype(bool)
+            _fast_xlsx_dump(df, self.schedule_file)
+            
+            # The table already matches this snapshot, so don't re-import it
+            with self._connect() as conn, conn:
+                self._record_schedule_mtime(conn, os.path.getmtime(self.schedule_file))
+            return True
+            
+        except Exception as e:
+            print(f"Error exporting doctor schedule: {e}")
+            return False
+    
+    def export_snapshots(self):
+        """Re-export appointments.xlsx and doctor_schedule.xlsx from the database"""
+        with self._export_lock:
+            if self._export_timer is not None:
+                self._export_timer.cancel()
+                self._export_timer = None
+        
+        # Writes are serialized separately so bookings never wait on an export
+        with self._export_write_lock:
+            appointments_ok = self.export_to_excel()
+            schedule_ok = self.export_schedule_to_excel()
+        return appointments_ok and schedule_ok
+    
+    def _schedule_snapshot_export(self):
+        """Export the snapshots SNAPSHOT_EXPORT_DELAY seconds from now unless one is already due"""
+        with self._export_lock:
+            if self._export_timer is None:
+                self._export_timer = threading.Timer(SNAPSHOT_EXPORT_DELAY, self.export_snapshots)
+                self._export_timer.daemon = True
+                self._export_timer.start()
+    
+    def create_appointments_file(self):
+        """Create appointments.xlsx with proper structure"""
+        if self.export_to_excel():
+            print(f"Created {self.appointments_file}")
     
     def create_admin_report_file(self):
         """Create admin_report.xlsx with proper structure"""
         try:
-            columns = [
-                'Report_Date', 'Appointment_ID', 'Patient_Name', 'Doctor',
-                'Appointment_Date', 'Appointment_Time', 'Patient_Type',
-                'Insurance_Carrier', 'Status', 'Notes'
-            ]
-            
-            df = pd.DataFrame(columns=columns)
-            df.to_excel(self.admin_report_file, index=False, engine='openpyxl')
+            df = pd.DataFrame(columns=ADMIN_REPORT_COLUMNS)
+            _write_excel_streaming(df, self.admin_report_file)
             print(f"Created {self.admin_report_file}")
             
         except Exception as e:
@@ -58,7 +382,7 @@ class ExcelManager:
                 'Phone': patient_data.get('phone', ''),
                 'Email': patient_data.get('email', ''),
                 'Doctor': patient_data['doctor'],
-                'Date': patient_data['appointment']['date'],
+                'Date': _iso_date(patient_data['appointment']['date']),
                 'Time': patient_data['appointment']['time'],
                 'Duration_Minutes': patient_data['appointment']['duration'],
                 'Status': 'Confirmed',
@@ -70,18 +394,26 @@ class ExcelManager:
                 'Notes': ''
             }
             
-            # Add to appointments file
-            if os.path.exists(self.appointments_file):
-                df = pd.read_excel(self.appointments_file)
-            else:
-                self.create_appointments_file()
-                df = pd.read_excel(self.appointments_file)
+            # Claim the slot and add the appointment in one transaction, so a
+            # slot that was already taken rolls back instead of double-booking
+            if not self._load_schedule():
+                print("Doctor schedule file not found")
+                return None
             
-            df = pd.concat([df, pd.DataFrame([appointment_record])], ignore_index=True)
-            df.to_excel(self.appointments_file, index=False, engine='openpyxl')
+            with self._connect() as conn, conn:
+                if not self._claim_slot(conn, patient_data):
+                    conn.rollback()
+                    print("Could not book appointment: the slot is no longer available")
+                    return None
+                
+                conn.execute(
+                    f"INSERT INTO appointments ({', '.join(APPOINTMENT_COLUMNS)}) "
+                    f"VALUES ({', '.join(':' + column for column in APPOINTMENT_COLUMNS)})",
+                    appointment_record
+                )
             
-            # Update doctor schedule
-            self.update_doctor_schedule(patient_data)
+            # Refresh the workbook snapshots off the booking path
+            self._schedule_snapshot_export()
             
             # Add new patient to CSV if needed
             if not patient_data.get('is_returning'):
@@ -96,36 +428,38 @@ class ExcelManager:
             print(f"Error booking appointment: {e}")
             return None
     
+    def _claim_slot(self, conn, patient_data):
+        """Mark the patient's slot as booked on conn; returns False if it was not open"""
+        # Find the slot to update
+        slot_id = patient_data['appointment'].get('slot_id')
+        if slot_id:
+            # Update by slot ID
+            where = "Slot_ID = ? AND Available = 1"
+            params = (slot_id,)
+        else:
+            # Update by doctor, date, and time
+            appointment_date = _iso_date(patient_data['appointment']['date'])
+            where = "Doctor = ? AND Date = ? AND Time = ? AND Available = 1"
+            params = (patient_data['doctor'], appointment_date, patient_data['appointment']['time'])
+        
+        # The Available = 1 guard means only the first claim on a slot matches a row
+        cursor = conn.execute(
+            f"UPDATE schedule SET Available = 0, Patient_Name = ?, Notes = 'Booked via AI Agent' WHERE {where}",
+            (patient_data['name'], *params)
+        )
+        return cursor.rowcount > 0
+    
     def update_doctor_schedule(self, patient_data):
         """Update doctor schedule to mark slot as booked"""
         try:
-            if not os.path.exists(self.schedule_file):
+            if not self._load_schedule():
                 print("Doctor schedule file not found")
                 return False
             
-            df = pd.read_excel(self.schedule_file)
+            with self._connect() as conn, conn:
+                claimed = self._claim_slot(conn, patient_data)
             
-            # Find the slot to update
-            slot_id = patient_data['appointment'].get('slot_id')
-            if slot_id:
-                # Update by slot ID
-                mask = df['Slot_ID'] == slot_id
-            else:
-                # Update by doctor, date, and time
-                appointment_date = pd.to_datetime(patient_data['appointment']['date']).date()
-                mask = (
-                    (df['Doctor'] == patient_data['doctor']) &
-                    (pd.to_datetime(df['Date']).dt.date == appointment_date) &
-                    (df['Time'] == patient_data['appointment']['time']) &
-                    (df['Available'] == True)
-                )
-            
-            if mask.any():
-                df.loc[mask, 'Available'] = False
-                df.loc[mask, 'Patient_Name'] = patient_data['name']
-                df.loc[mask, 'Notes'] = 'Booked via AI Agent'
-                
-                df.to_excel(self.schedule_file, index=False, engine='openpyxl')
+            if claimed:
                 print("Doctor schedule updated successfully")
                 return True
             else:
@@ -139,36 +473,31 @@ class ExcelManager:
     def get_available_slots(self, doctor=None, date=None):
         """Get available appointment slots"""
         try:
-            if not os.path.exists(self.schedule_file):
+            if not self._load_schedule():
                 return []
             
-            df = pd.read_excel(self.schedule_file)
-            
-            # Filter by available slots
-            available_df = df[df['Available'] == True]
+            conditions = ["Available = 1"]
+            params = []
             
             # Filter by doctor if specified
             if doctor:
-                available_df = available_df[available_df['Doctor'] == doctor]
+                conditions.append("Doctor = ?")
+                params.append(doctor)
             
             # Filter by date if specified
             if date:
-                if isinstance(date, str):
-                    date = pd.to_datetime(date).date()
-                available_df = available_df[pd.to_datetime(available_df['Date']).dt.date == date]
+                conditions.append("Date = ?")
+                params.append(_iso_date(date))
+            
+            with self._connect() as conn:
+                available_df = pd.read_sql(
+                    f"SELECT {', '.join(SLOT_FIELDS)} FROM schedule "
+                    f"WHERE {' AND '.join(conditions)} ORDER BY rowid",
+                    conn, params=params, parse_dates=['Date']
+                )
             
             # Convert to list of dictionaries
-            slots = []
-            for _, row in available_df.iterrows():
-                slots.append({
-                    'slot_id': row['Slot_ID'],
-                    'doctor': row['Doctor'],
-                    'date': row['Date'],
-                    'time': row['Time'],
-                    'duration': row['Duration_Minutes']
-                })
-            
-            return slots
+            return available_df.rename(columns=SLOT_FIELDS).to_dict('records')
             
         except Exception as e:
             print(f"Error getting available slots: {e}")
@@ -180,58 +509,38 @@ class ExcelManager:
             if report_date is None:
                 report_date = datetime.now().date()
             
-            if not os.path.exists(self.appointments_file):
-                print("No appointments file found")
-                return False
-            
-            appointments_df = pd.read_excel(self.appointments_file)
-            
-            # Filter appointments for the specified date
-            if not appointments_df.empty:
-                appointments_df['Date_Parsed'] = pd.to_datetime(appointments_df['Date'], errors='coerce')
-                daily_appointments = appointments_df[
-                    appointments_df['Date_Parsed'].dt.date == report_date
-                ]
-            else:
-                daily_appointments = appointments_df
+            # Fetch appointments for the specified date (indexed on Date)
+            with self._connect() as conn:
+                daily_appointments = pd.read_sql(
+                    "SELECT * FROM appointments WHERE Date = ? ORDER BY rowid",
+                    conn, params=(report_date.isoformat(),), parse_dates=['Date']
+                )
             
             # Create report records
-            report_records = []
-            for _, appointment in daily_appointments.iterrows():
-                report_record = {
-                    'Report_Date': report_date.strftime('%m/%d/%Y'),
-                    'Appointment_ID': appointment['Appointment_ID'],
-                    'Patient_Name': appointment['Patient_Name'],
-                    'Doctor': appointment['Doctor'],
-                    'Appointment_Date': appointment['Date'],
-                    'Appointment_Time': appointment['Time'],
-                    'Patient_Type': appointment['Patient_Type'],
-                    'Insurance_Carrier': appointment['Insurance_Carrier'],
-                    'Status': appointment['Status'],
-                    'Notes': appointment.get('Notes', '')
-                }
-                report_records.append(report_record)
-            
-            # Load existing report or create new one
+            report_date_str = report_date.strftime('%m/%d/%Y')
+            new_records_df = daily_appointments.rename(
+                columns={'Date': 'Appointment_Date', 'Time': 'Appointment_Time'}
+            ).assign(Report_Date=report_date_str)[ADMIN_REPORT_COLUMNS]
+            
+            # Load existing report or start an empty one (written out below)
             if os.path.exists(self.admin_report_file):
-                report_df = pd.read_excel(self.admin_report_file)
-                # Remove existing entries for this date
-                report_df = report_df[
-                    pd.to_datetime(report_df['Report_Date'], errors='coerce').dt.date != report_date
-                ]
+                report_df = _read_excel(self.admin_report_file)
+                # Remove existing entries for this date; Report_Date is always
+                # written as an MM/DD/YYYY string, so compare without parsing
+                report_df = report_df[report_df['Report_Date'] != report_date_str]
             else:
-                self.create_admin_report_file()
-                report_df = pd.read_excel(self.admin_report_file)
+                report_df = pd.DataFrame(columns=ADMIN_REPORT_COLUMNS)
             
             # Add new report records
-            if report_records:
-                new_records_df = pd.DataFrame(report_records)
+            if not new_records_df.empty:
                 report_df = pd.concat([report_df, new_records_df], ignore_index=True)
             
-            # Save updated report
-            report_df.to_excel(self.admin_report_file, index=False, engine='openpyxl')
+            # Save updated report and refresh the appointments/schedule snapshots
+            _write_excel_constant_memory(report_df, self.admin_report_file)
+            _remember_excel(self.admin_report_file, report_df)
+            self.export_snapshots()
             
-            print(f"Daily report generated for {report_date} - {len(report_records)} appointments")
+            print(f"Daily report generated for {report_date} - {len(new_records_df)} appointments")
             return True
             
         except Exception as e:
@@ -241,28 +550,30 @@ class ExcelManager:
     def get_appointment_stats(self):
         """Get appointment statistics"""
         try:
-            if not os.path.exists(self.appointments_file):
-                return {}
-            
-            df = pd.read_excel(self.appointments_file)
-            
-            if df.empty:
-                return {
-                    'total_appointments': 0,
-                    'new_patients': 0,
-                    'returning_patients': 0,
-                    'confirmed_appointments': 0,
-                    'by_doctor': {},
-                    'by_insurance': {}
-                }
+            # Count in SQLite rather than loading every appointment row
+            with self._connect() as conn:
+                total, new, returning, confirmed = conn.execute("""
+                    SELECT COUNT(*),
+                           COALESCE(SUM(Patient_Type = 'New'), 0),
+                           COALESCE(SUM(Patient_Type = 'Returning'), 0),
+                           COALESCE(SUM(Status = 'Confirmed'), 0)
+                    FROM appointments
+                """).fetchone()
+                
+                by_column = {}
+                for column in ('Doctor', 'Insurance_Carrier'):
+                    by_column[column] = dict(conn.execute(
+                        f"SELECT {column}, COUNT(*) FROM appointments WHERE {column} IS NOT NULL "
+                        f"GROUP BY {column} ORDER BY COUNT(*) DESC"
+                    ).fetchall())
             
             stats = {
-                'total_appointments': len(df),
-                'new_patients': len(df[df['Patient_Type'] == 'New']),
-                'returning_patients': len(df[df['Patient_Type'] == 'Returning']),
-                'confirmed_appointments': len(df[df['Status'] == 'Confirmed']),
-                'by_doctor': df['Doctor'].value_counts().to_dict(),
-                'by_insurance': df['Insurance_Carrier'].value_counts().to_dict()
+                'total_appointments': total,
+                'new_patients': new,
+                'returning_patients': returning,
+                'confirmed_appointments': confirmed,
+                'by_doctor': by_column['Doctor'],
+                'by_insurance': by_column['Insurance_Carrier']
             }
             
             return stats
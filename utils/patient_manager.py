@@ -1,45 +1,141 @@
 import pandas as pd
+import atexit
+import calendar
 import os
-from datetime import datetime
+import threading
+import weakref
+from collections import defaultdict, namedtuple
+from datetime import date
 import re
 
+# Three numeric fields sharing one separator, e.g. 03/08/2003, 2003-03-08, 8.3.03
+_DATE_RE = re.compile(r'(\d{1,4})([-/.])(\d{1,2})\2(\d{1,4})')
+
+# Name normalization: drop periods/commas and common prefixes/suffixes
+_NAME_PUNCT = str.maketrans('', '', '.,')
+_NAME_AFFIXES = frozenset(['mr', 'mrs', 'ms', 'dr', 'prof', 'jr', 'sr', 'ii', 'iii', 'iv'])
+
+# One loaded patients.csv with its lookup indexes; swapped as a whole on reload
+# so readers never mix indexes from one load with the frame of another
+_PatientSnapshot = namedtuple('_PatientSnapshot', 'df columns by_id by_name by_token')
+
+# Live managers with possibly unsaved visits; one exit hook flushes them all
+_managers = weakref.WeakSet()
+
+@atexit.register
+def _flush_all():
+    """Save every live manager's buffered visit-history updates at exit"""
+    for manager in list(_managers):
+        manager.flush()
+
 class PatientManager:
     """Manage patient data and lookups"""
     
     def __init__(self):
         self.patients_file = 'patients.csv'
+        self._lock = threading.RLock()
+        self._snapshot = None
+        self._mtime = None
+        
+        # Visit-history updates are applied in memory and written out in
+        # batches of flush_every, or flush_interval seconds after the first
+        # unsaved one; patient_id -> visit dates not yet saved to the CSV
+        self.flush_every = 32
+        self.flush_interval = 5.0
+        self._pending = defaultdict(list)
+        self._pending_count = 0
+        self._flush_timer = None
+        _managers.add(self)
+    
+    def _get_snapshot(self):
+        """Return the cached patients snapshot, reloading it if the CSV changed"""
+        if not os.path.exists(self.patients_file):
+            return None
+        
+        with self._lock:
+            mtime = os.path.getmtime(self.patients_file)
+            if self._snapshot is None or mtime != self._mtime:
+                df = pd.read_csv(self.patients_file)
+                columns = list(df.columns)
+                
+                # Precompute lookup keys once per load instead of once per call
+                df['_name_norm'] = df['name'].map(self.normalize_name)
+                df['_dob_parsed'] = df['DOB'].map(self.parse_date)
+                
+                # One lowercased name/phone/email string per patient for search
+                df['_search_blob'] = (
+                    df['name'].fillna('').astype(str).str.lower() + '\x00' +
+                    df['phone'].fillna('').astype(str).str.lower() + '\x00' +
+                    df['email'].fillna('').astype(str).str.lower()
+                )
+                
+                # All indexes hold row positions, read back with iloc/iat
+                by_id = dict(zip(df['patient_id'].tolist(), range(len(df))))
+                by_name = defaultdict(list)
+                by_token = defaultdict(set)
+                for idx, name_norm in enumerate(df['_name_norm'].tolist()):
+                    by_name[name_norm].append(idx)
+                    for token in set(name_norm.split()):
+                        by_token[token].add(idx)
+                
+                # Keep unsaved visits when the file changed underneath us
+                for patient_id, visits in self._pending.items():
+                    idx = by_id.get(patient_id)
+                    if idx is not None:
+                        for visit_date_str in visits:
+                            self._append_visit(df, idx, visit_date_str)
+                
+                self._snapshot = _PatientSnapshot(df, columns, by_id, by_name, by_token)
+                self._mtime = mtime
+            
+            return self._snapshot
+    
+    def _append_visit(self, df, idx, visit_date_str):
+        """Append a visit date to one row's visit history in memory"""
+        history_col = df.columns.get_loc('visit_history')
+        current_history = df.iat[idx, history_col]
+        
+        if pd.isna(current_history) or current_history == 'New Patient':
+            df.iat[idx, history_col] = visit_date_str
+        else:
+            df.iat[idx, history_col] = f"{current_history}; {visit_date_str}"
+    
+    def _record(self, snapshot, idx):
+        """Return a patient row as a dict without the cached lookup columns"""
+        return snapshot.df.iloc[idx, :len(snapshot.columns)].to_dict()
     
     def lookup_patient(self, name, dob):
         """Look up patient by name and date of birth"""
         try:
-            if not os.path.exists(self.patients_file):
-                return None
+            snapshot = self._get_snapshot()
             
-            df = pd.read_csv(self.patients_file)
-            
-            if df.empty:
+            if snapshot is None or snapshot.df.empty:
                 return None
+            df = snapshot.df
             
             # Clean and normalize name for comparison
             name_clean = self.normalize_name(name)
+            dob_parsed = self.parse_date(dob)
+            
+            if dob_parsed is None:
+                return None
             
             # Look for exact matches first
-            for _, patient in df.iterrows():
-                patient_name_clean = self.normalize_name(patient['name'])
-                patient_dob = patient['DOB']
-                
-                if (patient_name_clean == name_clean and 
-                    self.compare_dates(patient_dob, dob)):
-                    return patient.to_dict()
-            
-            # If no exact match, try partial name matching
-            for _, patient in df.iterrows():
-                patient_name_clean = self.normalize_name(patient['name'])
-                patient_dob = patient['DOB']
-                
-                if (self.partial_name_match(patient_name_clean, name_clean) and 
-                    self.compare_dates(patient_dob, dob)):
-                    return patient.to_dict()
+            for idx in snapshot.by_name.get(name_clean, []):
+                if df['_dob_parsed'].iat[idx] == dob_parsed:
+                    return self._record(snapshot, idx)
+            
+            # If no exact match, try partial name matching: rows sharing at
+            # least 2 name words with the query, found through the token index
+            word_hits = defaultdict(int)
+            for token in set(name_clean.split()):
+                for idx in snapshot.by_token.get(token, ()):
+                    word_hits[idx] += 1
+            
+            candidates = [idx for idx, hits in word_hits.items() if hits >= 2]
+            for idx in sorted(candidates):
+                if df['_dob_parsed'].iat[idx] == dob_parsed:
+                    return self._record(snapshot, idx)
             
             return None
             
@@ -52,22 +148,11 @@ class PatientManager:
         if not name:
             return ""
         
-        # Remove extra spaces, convert to lowercase
-        normalized = re.sub(r'\s+', ' ', str(name).strip().lower())
+        # Convert to lowercase, strip punctuation and split on any whitespace
+        words = str(name).lower().translate(_NAME_PUNCT).split()
         
         # Remove common prefixes/suffixes
-        prefixes = ['mr', 'mrs', 'ms', 'dr', 'prof']
-        suffixes = ['jr', 'sr', 'ii', 'iii', 'iv']
-        
-        words = normalized.split()
-        cleaned_words = []
-        
-        for word in words:
-            word_clean = word.replace('.', '').replace(',', '')
-            if word_clean not in prefixes and word_clean not in suffixes:
-                cleaned_words.append(word_clean)
-        
-        return ' '.join(cleaned_words)
+        return ' '.join(word for word in words if word not in _NAME_AFFIXES)
     
     def partial_name_match(self, name1, name2):
         """Check if names partially match (for fuzzy matching)"""
@@ -99,34 +184,43 @@ class PatientManager:
         if not date_str:
             return None
         
-        date_formats = [
-            '%m/%d/%Y', '%m-%d-%Y', '%m.%d.%Y',
-            '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y',
-            '%Y/%m/%d', '%Y-%m-%d', '%Y.%m.%d',
-            '%m/%d/%y', '%m-%d-%y', '%m.%d.%y',
-            '%d/%m/%y', '%d-%m-%y', '%d.%m.%y'
-        ]
+        match = _DATE_RE.fullmatch(str(date_str).strip())
+        if not match:
+            return None
+        
+        first, _, second, last = match.groups()
+        
+        # Same precedence as the old strptime format list: Y/m/d when the year
+        # leads, otherwise m/d before d/m, with 2-digit years pivoting like %y
+        if len(first) == 4:
+            if len(last) > 2:
+                return None
+            candidates = [(int(first), int(second), int(last))]
+        elif len(first) <= 2 and len(last) in (2, 4):
+            year = int(last)
+            if len(last) == 2:
+                year += 2000 if year < 69 else 1900
+            candidates = [(year, int(first), int(second)), (year, int(second), int(first))]
+        else:
+            return None
         
-        for fmt in date_formats:
-            try:
-                return datetime.strptime(str(date_str).strip(), fmt).date()
-            except ValueError:
-                continue
+        for year, month, day in candidates:
+            if year >= 1 and 1 <= month <= 12 and 1 <= day <= calendar.monthrange(year, month)[1]:
+                return date(year, month, day)
         
         return None
     
     def get_patient_by_id(self, patient_id):
         """Get patient by patient ID"""
         try:
-            if not os.path.exists(self.patients_file):
+            snapshot = self._get_snapshot()
+            if snapshot is None:
                 return None
             
-            df = pd.read_csv(self.patients_file)
+            idx = snapshot.by_id.get(patient_id)
             
-            patient = df[df['patient_id'] == patient_id]
-            
-            if not patient.empty:
-                return patient.iloc[0].to_dict()
+            if idx is not None:
+                return self._record(snapshot, idx)
             
             return None
             
@@ -137,24 +231,18 @@ class PatientManager:
     def search_patients(self, search_term):
         """Search patients by name, phone, or email"""
         try:
-            if not os.path.exists(self.patients_file):
-                return []
+            snapshot = self._get_snapshot()
             
-            df = pd.read_csv(self.patients_file)
-            
-            if df.empty:
+            if snapshot is None or snapshot.df.empty:
                 return []
+            df = snapshot.df
             
             search_term_lower = search_term.lower()
             
             # Search in name, phone, and email
-            matches = df[
-                df['name'].str.lower().str.contains(search_term_lower, na=False) |
-                df['phone'].str.contains(search_term, na=False) |
-                df['email'].str.lower().str.contains(search_term_lower, na=False)
-            ]
+            matches = df[df['_search_blob'].str.contains(search_term_lower, regex=False)]
             
-            return matches.to_dict('records')
+            return matches[snapshot.columns].to_dict('records')
             
         except Exception as e:
             print(f"Error searching patients: {e}")
@@ -163,36 +251,37 @@ class PatientManager:
     def update_patient_visit_history(self, patient_id, visit_date):
         """Update patient's visit history"""
         try:
-            if not os.path.exists(self.patients_file):
-                return False
-            
-            df = pd.read_csv(self.patients_file)
-            
-            # Find patient
-            patient_mask = df['patient_id'] == patient_id
-            
-            if not patient_mask.any():
-                return False
-            
-            # Get current visit history
-            current_history = df.loc[patient_mask, 'visit_history'].iloc[0]
-            
             # Format visit date
             if isinstance(visit_date, str):
                 visit_date_str = visit_date
             else:
                 visit_date_str = visit_date.strftime('%m/%d/%Y')
             
-            # Update visit history
-            if pd.isna(current_history) or current_history == 'New Patient':
-                new_history = visit_date_str
-            else:
-                new_history = f"{current_history}; {visit_date_str}"
-            
-            df.loc[patient_mask, 'visit_history'] = new_history
+            # Update visit history; the CSV is rewritten once per batch. The
+            # snapshot is taken under the lock so a reload can't slip in between
+            with self._lock:
+                snapshot = self._get_snapshot()
+                if snapshot is None:
+                    return False
+                
+                # Find patient
+                idx = snapshot.by_id.get(patient_id)
+                if idx is None:
+                    return False
+                
+                self._append_visit(snapshot.df, idx, visit_date_str)
+                self._pending[patient_id].append(visit_date_str)
+                self._pending_count += 1
+                batch_full = self._pending_count >= self.flush_every
+                
+                # Bound how long an update can sit unsaved if the process dies
+                if not batch_full and self._flush_timer is None:
+                    self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
             
-            # Save updated data
-            df.to_csv(self.patients_file, index=False)
+            if batch_full:
+                self.flush()
             
             print(f"Updated visit history for patient {patient_id}")
             return True
@@ -201,13 +290,38 @@ class PatientManager:
             print(f"Error updating patient visit history: {e}")
             return False
     
+    def flush(self):
+        """Save buffered visit-history updates to the patients CSV"""
+        try:
+            with self._lock:
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+                
+                # Reload first if the file changed, so its new rows are kept
+                snapshot = self._get_snapshot()
+                if snapshot is None or not self._pending:
+                    return True
+                
+                snapshot.df[snapshot.columns].to_csv(self.patients_file, index=False)
+                self._mtime = os.path.getmtime(self.patients_file)
+                self._pending.clear()
+                self._pending_count = 0
+            
+            return True
+            
+        except Exception as e:
+            print(f"Error saving patient visit history: {e}")
+            return False
+    
     def get_patient_stats(self):
         """Get patient statistics"""
         try:
-            if not os.path.exists(self.patients_file):
-                return {}
+            snapshot = self._get_snapshot()
             
-            df = pd.read_csv(self.patients_file)
+            if snapshot is None:
+                return {}
+            df = snapshot.df
             
             if df.empty:
                 return {
@@ -217,9 +331,9 @@ class PatientManager:
                     'by_insurance': {}
                 }
             
-            # Count new vs returning patients
-            new_patients = len(df[df['visit_history'] == 'New Patient'])
-            returning_patients = len(df[df['visit_history'] != 'New Patient'])
+            # Count new vs returning patients; every other row is returning
+            new_patients = int((df['visit_history'] == 'New Patient').sum())
+            returning_patients = len(df) - new_patients
             
             stats = {
                 'total_patients': len(df),
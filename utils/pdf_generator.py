@@ -1,57 +1,33 @@
+import logging
 import os
+import threading
+import uuid
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from io import BytesIO
+from functools import lru_cache
+from string import Template
+
+logger = logging.getLogger(__name__)
+
 try:
+    from reportlab import rl_config
     from reportlab.pdfgen import canvas
-    from reportlab.lib.pagesizes import letter, A4
-    from reportlab.lib.styles import getSampleStyleSheet
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-    from reportlab.lib.units import inch
-    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    
+    # Skip ReportLab's per-attribute shape validation
+    rl_config.shapeChecking = 0
 except ImportError:
-    print("ReportLab not available. Using simple text-based PDF generation.")
+    canvas = None
+    logger.warning("ReportLab not available. Using simple text-based PDF generation.")
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:
+    PdfReader = None
 
-class PDFGenerator:
-    """Service for generating PDF documents"""
-    
-    def __init__(self):
-        self.output_dir = "generated_pdfs"
-        if not os.path.exists(self.output_dir):
-            os.makedirs(self.output_dir)
-    
-    def generate_intake_form(self, patient_data):
-        """Use the professional MediCare intake form"""
-        try:
-            # Use the professional PDF form provided by the user
-            professional_form_paths = [
-                "intake_forms/MediCare_Patient_Intake_Form.pdf",
-                "attached_assets/New Patient Intake Form_1757083008873.pdf"
-            ]
-            
-            # Find the professional form
-            professional_form = None
-            for path in professional_form_paths:
-                if os.path.exists(path):
-                    professional_form = path
-                    break
-            
-            if professional_form:
-                print(f"Using professional intake form: {professional_form}")
-                return professional_form
-            else:
-                # Fallback to generating a custom form with their clinic info
-                return self._generate_medicare_style_form(patient_data)
-                
-        except Exception as e:
-            print(f"Error with intake form: {e}")
-            return self._generate_medicare_style_form(patient_data)
-    
-    def _generate_medicare_style_form(self, patient_data):
-        """Generate intake form matching the MediCare style"""
-        try:
-            filename = f"MediCare_Intake_Form_{patient_data['name'].replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.pdf"
-            filepath = os.path.join(self.output_dir, filename)
-            
-            content = f"""
+# Form text is parsed once here; each call only substitutes patient fields
+_MEDICARE_INTAKE_TEMPLATE = Template("""
 MediCare Allergy & Wellness Center
 456 Healthcare Boulevard, Suite 300 | Phone: (555) 123-4567
 
@@ -61,21 +37,21 @@ Please complete this form and bring it to your appointment or submit online 24 h
 ================================================================================
 PATIENT INFORMATION (Pre-filled from your booking)
 
-Last Name: {patient_data['name'].split()[-1] if ' ' in patient_data['name'] else patient_data['name']}
-First Name: {patient_data['name'].split()[0] if ' ' in patient_data['name'] else patient_data['name']}
-Date of Birth: {patient_data['dob']}
-Cell Phone: {patient_data.get('phone', '')}
-Email Address: {patient_data.get('email', '')}
+Last Name: $last_name
+First Name: $first_name
+Date of Birth: $dob
+Cell Phone: $phone
+Email Address: $email
 
 Appointment Details:
-Date: {patient_data['appointment']['date']}
-Time: {patient_data['appointment']['time']}
-Doctor: {patient_data['doctor']}
+Date: $appointment_date
+Time: $appointment_time
+Doctor: $doctor
 
 Insurance Information:
-Insurance Company: {patient_data.get('carrier', '')}
-Member ID: {patient_data.get('member_id', '')}
-Group Number: {patient_data.get('group_number', '')}
+Insurance Company: $carrier
+Member ID: $member_id
+Group Number: $group_number
 
 ================================================================================
 PLEASE COMPLETE THE FOLLOWING SECTIONS:
@@ -155,256 +131,568 @@ Date Received: _________ | Staff Initial: _________ | Chart #: _________
 
 MediCare Allergy & Wellness Center | 456 Healthcare Boulevard, Suite 300 | (555) 123-4567
 Please submit this form 24 hours before your appointment or arrive 15 minutes early if completing at the office.
-"""
+""")
+
+_APPOINTMENT_SUMMARY_TEMPLATE = Template("""
+APPOINTMENT CONFIRMATION SUMMARY
+
+Medical Center
+123 Healthcare Drive
+Medical City, MC 12345
+Phone: (555) 123-4567
+
+================================================================================
+
+APPOINTMENT DETAILS
+
+Patient: $name
+Date of Birth: $dob
+Appointment Date: $appointment_date
+Appointment Time: $appointment_time
+Doctor: $doctor
+Duration: $duration minutes
+Appointment ID: $appointment_id
+
+Contact Information:
+Phone: $phone
+Email: $email
+
+Insurance Information:
+Carrier: $carrier
+Member ID: $member_id
+Group Number: $group_number
+
+================================================================================
+
+IMPORTANT REMINDERS
+
+- Please arrive 15 minutes early for check-in
+- Bring a valid photo ID and insurance card
+- $intake_reminder
+- If you need to cancel or reschedule, please call at least 24 hours in advance
+
+Thank you for choosing Medical Center!
+""")
+
+@lru_cache(maxsize=None)
+def _compile_template_source(text, delimiter, pattern):
+    """Turn Template text into one keyword-only lambda returning an f-string"""
+    pieces, fields, literal, pos = [], {}, '', 0
+    for match in pattern.finditer(text):
+        literal += text[pos:match.start()]
+        pos = match.end()
+        if match.group('escaped') is not None:
+            literal += delimiter
+            continue
+        name = match.group('named') or match.group('braced')
+        if name is None:
+            raise ValueError(f"Invalid placeholder in template at offset {match.start()}")
+        # Literal text is repr()'d with braces doubled, so it passes through
+        # the f-string untouched
+        pieces.append('f' + repr(literal.replace('{', '{{').replace('}', '}}')))
+        pieces.append(f"f'{{{name}}}'")
+        fields[name] = None
+        literal = ''
+    pieces.append(repr(literal + text[pos:]))
+    
+    params = f"*, {', '.join(fields)}" if fields else ''
+    source = f"lambda {params}: ({' '.join(pieces)})"
+    return eval(compile(source, '<template>', 'eval'), {})
+
+def _compile_template(template):
+    """Compile a string.Template into a formatter taking its fields as keywords"""
+    return _compile_template_source(template.template, template.delimiter, template.pattern)
+
+# Generated once at import; calls skip Template's per-call placeholder scan
+_FMT_MEDICARE_INTAKE = _compile_template(_MEDICARE_INTAKE_TEMPLATE)
+_FMT_APPOINTMENT_SUMMARY = _compile_template(_APPOINTMENT_SUMMARY_TEMPLATE)
+
+# ReportLab intake form: (bold, text) per line, with {field} placeholders
+_INTAKE_LEFT_MARGIN = 72
+_INTAKE_TOP = 720
+_INTAKE_BOTTOM = 72
+_INTAKE_LINE_HEIGHT = 14
+_BLANK_LINE = "_______________________________________________________________"
+_INTAKE_FORM_LINES = [
+    (True, "Medical Center"),
+    (False, "123 Healthcare Drive"),
+    (False, "Medical City, MC 12345"),
+    (False, "Phone: (555) 123-4567"),
+    (False, "Fax: (555) 123-4568"),
+    (False, ""),
+    (True, "PATIENT INFORMATION"),
+    (False, "Name: {name}"),
+    (False, "Date of Birth: {dob}"),
+    (False, "Phone: {phone}"),
+    (False, "Email: {email}"),
+    (False, "Appointment Date: {appointment_date}"),
+    (False, "Appointment Time: {appointment_time}"),
+    (False, "Doctor: {doctor}"),
+    (False, ""),
+    (True, "INSURANCE INFORMATION"),
+    (False, "Primary Insurance: {carrier}"),
+    (False, "Member ID: {member_id}"),
+    (False, "Group Number: {group_number}"),
+    (False, ""),
+    (True, "MEDICAL HISTORY (Please complete the following sections)"),
+    (False, ""),
+    (True, "Current Medications:"),
+    (False, _BLANK_LINE),
+    (False, _BLANK_LINE),
+    (False, _BLANK_LINE),
+    (False, ""),
+    (True, "Allergies:"),
+    (False, _BLANK_LINE),
+    (False, _BLANK_LINE),
+    (False, ""),
+    (True, "Previous Surgeries:"),
+    (False, _BLANK_LINE),
+    (False, _BLANK_LINE),
+    (False, ""),
+    (True, "Family Medical History:"),
+    (False, _BLANK_LINE),
+    (False, _BLANK_LINE),
+    (False, _BLANK_LINE),
+    (False, ""),
+    (True, "Current Symptoms/Reason for Visit:"),
+    (False, _BLANK_LINE),
+    (False, _BLANK_LINE),
+    (False, _BLANK_LINE),
+    (False, ""),
+    (True, "Emergency Contact:"),
+    (False, "Name: ___________________________________ Phone: _______________"),
+    (False, "Relationship: _____________________________"),
+    (False, ""),
+    (True, "CONSENT"),
+    (False, "I consent to treatment and authorize the release of medical information for insurance purposes."),
+    (False, ""),
+    (False, "Patient Signature: _________________________________ Date: __________"),
+]
+
+# Baseline (x, y) in points of each pre-filled value on page 1 of the
+# professional form, just below the printed field labels; the date of birth
+# goes right of the form's own "MM/DD/YYYY" placeholder
+_PROFESSIONAL_FORM_FIELDS = {
+    'last_name': (67, 636),
+    'first_name': (227, 636),
+    'dob': (150, 597),
+    'phone': (227, 556),
+    'email': (387, 556),
+    'carrier': (74, 261),
+    'member_id': (74, 225),
+    'group_number': (74, 188),
+}
+
+# The form has no appointment fields, so the booking is noted right-aligned
+# in the empty end of the PATIENT INFORMATION heading row
+_PROFESSIONAL_FORM_APPOINTMENT = (530, 677)
+
+# Text intake form: static lines around the per-patient section, joined once per form
+_SIMPLE_INTAKE_HEADER = (
+    "",
+    "NEW PATIENT INTAKE FORM",
+    "",
+    "Medical Center",
+    "123 Healthcare Drive",
+    "Medical City, MC 12345",
+    "Phone: (555) 123-4567",
+    "Fax: (555) 123-4568",
+    "",
+    "================================================================================",
+    "",
+    "PATIENT INFORMATION",
+)
+_SIMPLE_INTAKE_FOOTER = (
+    "",
+    "================================================================================",
+    "",
+    "MEDICAL HISTORY (Please complete the following sections)",
+    "",
+    "Current Medications:",
+    "_________________________________________________________________",
+    "_________________________________________________________________",
+    "_________________________________________________________________",
+    "",
+    "Allergies:",
+    "_________________________________________________________________",
+    "_________________________________________________________________",
+    "",
+    "Previous Surgeries:",
+    "_________________________________________________________________",
+    "_________________________________________________________________",
+    "",
+    "Family Medical History:",
+    "_________________________________________________________________",
+    "_________________________________________________________________",
+    "_________________________________________________________________",
+    "",
+    "Current Symptoms/Reason for Visit:",
+    "_________________________________________________________________",
+    "_________________________________________________________________",
+    "_________________________________________________________________",
+    "",
+    "Emergency Contact:",
+    "Name: _________________________________ Phone: _______________",
+    "Relationship: _____________________________",
+    "",
+    "================================================================================",
+    "",
+    "CONSENT",
+    "I consent to treatment and authorize the release of medical information ",
+    "for insurance purposes.",
+    "",
+    "Patient Signature: _______________________________ Date: __________",
+    "",
+    "================================================================================",
+    "",
+    "Please complete this form and bring it to your appointment, or submit it ",
+    "online through our patient portal.",
+    "",
+    "Thank you for choosing Medical Center!",
+    "",
+)
+
+def _write_text(path, text):
+    """Write a whole UTF-8 text file through a raw fd, without a buffered text wrapper"""
+    data = memoryview(text.encode('utf-8'))
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        while data:
+            data = data[os.write(fd, data):]
+    finally:
+        os.close(fd)
+
+@lru_cache(maxsize=4)
+def _load_form_bytes(path, mtime):
+    """Read a static form file once per (path, mtime)"""
+    with open(path, 'rb') as f:
+        return f.read()
+
+# PdfReader parses objects lazily from one shared stream, so concurrent
+# generate_many workers take turns cloning the cached form
+_form_reader_lock = threading.Lock()
+
+@lru_cache(maxsize=4)
+def _load_form_reader(path, mtime):
+    """Parse a static PDF form once per (path, mtime)"""
+    return PdfReader(BytesIO(_load_form_bytes(path, mtime)))
+
+class PDFGenerator:
+    """Service for generating PDF documents"""
+    
+    def __init__(self):
+        self.output_dir = "generated_pdfs"
+        os.makedirs(self.output_dir, exist_ok=True)
+        
+        # Use the professional PDF form provided by the user; resolved once
+        # since these static assets don't come and go while the app runs
+        professional_form_paths = [
+            "intake_forms/MediCare_Patient_Intake_Form.pdf",
+            "attached_assets/New Patient Intake Form_1757083008873.pdf"
+        ]
+        self._professional_form = next(
+            (path for path in professional_form_paths if os.path.exists(path)), None
+        )
+    
+    def generate_intake_form(self, patient_data):
+        """Use the professional MediCare intake form"""
+        try:
+            professional_form = self._professional_form
             
-            # Write as text file since we can't generate actual PDF
-            txt_filepath = filepath.replace('.pdf', '.txt')
-            with open(txt_filepath, 'w') as f:
-                f.write(content)
+            if professional_form:
+                logger.info("Using professional intake form: %s", professional_form)
+                return self._fill_professional_form(patient_data, professional_form) or professional_form
+            else:
+                # Fallback to generating a custom form with their clinic info
+                return self._generate_medicare_style_form(patient_data)
+                
+        except Exception as e:
+            logger.error("Error with intake form: %s", e)
+            return self._generate_medicare_style_form(patient_data)
+    
+    def get_intake_form_bytes(self, patient_data):
+        """Return the intake form as bytes, filling the professional form in memory"""
+        try:
+            professional_form = self._professional_form
+            if professional_form:
+                # Served straight from memory; nothing is written to disk
+                filled = self._render_filled_form(patient_data, professional_form)
+                if filled is not None:
+                    return filled
+                return _load_form_bytes(professional_form, os.path.getmtime(professional_form))
             
-            print(f"MediCare-style intake form generated: {txt_filepath}")
-            return txt_filepath
+            form_path = self.generate_intake_form(patient_data)
+            if not form_path:
+                return None
             
+            # Generated forms are per patient, so they are not cached
+            with open(form_path, 'rb') as f:
+                return f.read()
+                
         except Exception as e:
-            print(f"Error generating MediCare-style intake form: {e}")
+            logger.error("Error reading intake form: %s", e)
             return None
     
-    def _generate_intake_form_reportlab(self, patient_data, filepath):
-        """Generate intake form using ReportLab"""
+    def _intake_form_path(self, patient_data):
+        """Output path for a patient's intake form, unique per appointment"""
+        # Patients can share a name, so the appointment ID (or a random tag
+        # when there isn't one yet) keeps concurrent forms from colliding
+        suffix = patient_data.get('appointment_id') or uuid.uuid4().hex[:8].upper()
+        filename = f"MediCare_Intake_Form_{patient_data['name'].replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}_{suffix}.pdf"
+        return os.path.join(self.output_dir, filename)
+    
+    def _fill_professional_form(self, patient_data, form_path):
+        """Write a pre-filled copy of the professional form and return its path"""
+        filled = self._render_filled_form(patient_data, form_path)
+        if filled is None:
+            return None
+        
         try:
-            doc = SimpleDocTemplate(filepath, pagesize=letter)
-            styles = getSampleStyleSheet()
-            story = []
+            filepath = self._intake_form_path(patient_data)
+            with open(filepath, 'wb') as f:
+                f.write(filled)
             
-            # Title
-            title = Paragraph("<b>NEW PATIENT INTAKE FORM</b>", styles['Title'])
-            story.append(title)
-            story.append(Spacer(1, 20))
+            logger.info("Pre-filled intake form generated: %s", filepath)
+            return filepath
             
-            # Medical Center Info
-            center_info = Paragraph("""
-            <b>Medical Center</b><br/>
-            123 Healthcare Drive<br/>
-            Medical City, MC 12345<br/>
-            Phone: (555) 123-4567<br/>
-            Fax: (555) 123-4568<br/>
-            """, styles['Normal'])
-            story.append(center_info)
-            story.append(Spacer(1, 20))
+        except OSError as e:
+            logger.error("Error writing pre-filled intake form: %s", e)
+            return None
+    
+    def _render_filled_form(self, patient_data, form_path):
+        """Return the professional form's bytes with a one-page text overlay merged onto page 1"""
+        if PdfReader is None or canvas is None:
+            return None
+        
+        try:
+            with _form_reader_lock:
+                reader = _load_form_reader(form_path, os.path.getmtime(form_path))
+                writer = PdfWriter(clone_from=reader)
+            page = writer.pages[0]
             
-            # Patient Information (pre-filled from booking)
-            patient_info = Paragraph(f"""
-            <b>PATIENT INFORMATION</b><br/>
-            <b>Name:</b> {patient_data['name']}<br/>
-            <b>Date of Birth:</b> {patient_data['dob']}<br/>
-            <b>Phone:</b> {patient_data.get('phone', '')}<br/>
-            <b>Email:</b> {patient_data.get('email', '')}<br/>
-            <b>Appointment Date:</b> {patient_data['appointment']['date']}<br/>
-            <b>Appointment Time:</b> {patient_data['appointment']['time']}<br/>
-            <b>Doctor:</b> {patient_data['doctor']}<br/>
-            """, styles['Normal'])
-            story.append(patient_info)
-            story.append(Spacer(1, 20))
+            name = patient_data['name']
+            name_parts = name.split() or [name]
+            fields = {
+                'last_name': name_parts[-1],
+                'first_name': name_parts[0],
+                'dob': patient_data['dob'],
+                'phone': patient_data.get('phone', ''),
+                'email': patient_data.get('email', ''),
+                'carrier': patient_data.get('carrier', ''),
+                'member_id': patient_data.get('member_id', ''),
+                'group_number': patient_data.get('group_number', '')
+            }
             
-            # Insurance Information (pre-filled)
-            insurance_info = Paragraph(f"""
-            <b>INSURANCE INFORMATION</b><br/>
-            <b>Primary Insurance:</b> {patient_data.get('carrier', '')}<br/>
-            <b>Member ID:</b> {patient_data.get('member_id', '')}<br/>
-            <b>Group Number:</b> {patient_data.get('group_number', '')}<br/>
-            """, styles['Normal'])
-            story.append(insurance_info)
-            story.append(Spacer(1, 20))
+            # Only the field values are drawn; the form's own content streams
+            # are copied as-is rather than re-rendered
+            buffer = BytesIO()
+            c = canvas.Canvas(buffer, pagesize=(float(page.mediabox.width), float(page.mediabox.height)))
+            c.setFont('Helvetica', 10)
+            for field, (x, y) in _PROFESSIONAL_FORM_FIELDS.items():
+                if fields[field]:
+                    c.drawString(x, y, str(fields[field]))
             
-            # Medical History Section (to be filled by patient)
-            medical_history = Paragraph("""
-            <b>MEDICAL HISTORY</b> (Please complete the following sections)<br/><br/>
+            appointment_date = pd.Timestamp(patient_data['appointment']['date']).strftime('%m/%d/%Y')
+            c.setFont('Helvetica', 9)
+            c.drawRightString(
+                *_PROFESSIONAL_FORM_APPOINTMENT,
+                f"Appointment: {appointment_date} at "
+                f"{patient_data['appointment']['time']} with {patient_data['doctor']}"
+            )
+            c.showPage()
+            c.save()
+            buffer.seek(0)
             
-            <b>Current Medications:</b><br/>
-            _______________________________________________________________<br/>
-            _______________________________________________________________<br/>
-            _______________________________________________________________<br/><br/>
+            page.merge_page(PdfReader(buffer).pages[0])
             
-            <b>Allergies:</b><br/>
-            _______________________________________________________________<br/>
-            _______________________________________________________________<br/><br/>
+            output = BytesIO()
+            writer.write(output)
+            return output.getvalue()
             
-            <b>Previous Surgeries:</b><br/>
-            _______________________________________________________________<br/>
-            _______________________________________________________________<br/><br/>
+        except Exception as e:
+            logger.error("Error pre-filling professional intake form: %s", e)
+            return None
+    
+    def _generate_medicare_style_form(self, patient_data):
+        """Generate intake form matching the MediCare style"""
+        try:
+            # Split the name once for the first/last name fields
+            name = patient_data['name']
+            name_parts = name.split() or [name]
             
-            <b>Family Medical History:</b><br/>
-            _______________________________________________________________<br/>
-            _______________________________________________________________<br/>
-            _______________________________________________________________<br/><br/>
+            filepath = self._intake_form_path(patient_data)
             
-            <b>Current Symptoms/Reason for Visit:</b><br/>
-            _______________________________________________________________<br/>
-            _______________________________________________________________<br/>
-            _______________________________________________________________<br/><br/>
+            content = _FMT_MEDICARE_INTAKE(
+                last_name=name_parts[-1],
+                first_name=name_parts[0],
+                dob=patient_data['dob'],
+                phone=patient_data.get('phone', ''),
+                email=patient_data.get('email', ''),
+                appointment_date=patient_data['appointment']['date'],
+                appointment_time=patient_data['appointment']['time'],
+                doctor=patient_data['doctor'],
+                carrier=patient_data.get('carrier', ''),
+                member_id=patient_data.get('member_id', ''),
+                group_number=patient_data.get('group_number', '')
+            )
             
-            <b>Emergency Contact:</b><br/>
-            Name: ___________________________________ Phone: _______________<br/>
-            Relationship: _____________________________<br/><br/>
+            # Write as text file since we can't generate actual PDF
+            txt_filepath = filepath.replace('.pdf', '.txt')
+            _write_text(txt_filepath, content)
             
-            <b>CONSENT</b><br/>
-            I consent to treatment and authorize the release of medical information for insurance purposes.<br/><br/>
+            logger.info("MediCare-style intake form generated: %s", txt_filepath)
+            return txt_filepath
             
-            Patient Signature: _________________________________ Date: __________<br/>
-            """, styles['Normal'])
-            story.append(medical_history)
+        except Exception as e:
+            logger.error("Error generating MediCare-style intake form: %s", e)
+            return None
+    
+    def _generate_intake_form_reportlab(self, patient_data, filepath):
+        """Generate intake form using ReportLab"""
+        try:
+            fields = {
+                'name': patient_data['name'],
+                'dob': patient_data['dob'],
+                'phone': patient_data.get('phone', ''),
+                'email': patient_data.get('email', ''),
+                'appointment_date': patient_data['appointment']['date'],
+                'appointment_time': patient_data['appointment']['time'],
+                'doctor': patient_data['doctor'],
+                'carrier': patient_data.get('carrier', ''),
+                'member_id': patient_data.get('member_id', ''),
+                'group_number': patient_data.get('group_number', '')
+            }
             
-            # Build PDF
-            doc.build(story)
+            # Fixed layout, so draw each line directly instead of laying out
+            # Paragraph markup
+            c = canvas.Canvas(filepath, pagesize=letter)
+            c.setFont('Helvetica-Bold', 14)
+            c.drawString(_INTAKE_LEFT_MARGIN, _INTAKE_TOP, "NEW PATIENT INTAKE FORM")
+            y = _INTAKE_TOP - 30
             
-            print(f"Intake form generated: {filepath}")
+            for bold, line in _INTAKE_FORM_LINES:
+                if y < _INTAKE_BOTTOM:
+                    c.showPage()
+                    y = _INTAKE_TOP
+                if line:
+                    c.setFont('Helvetica-Bold' if bold else 'Helvetica', 10)
+                    c.drawString(_INTAKE_LEFT_MARGIN, y, line.format_map(fields))
+                y -= _INTAKE_LINE_HEIGHT
+            
+            c.showPage()
+            c.save()
+            
+            logger.info("Intake form generated: %s", filepath)
             return filepath
             
         except Exception as e:
-            print(f"Error with ReportLab PDF generation: {e}")
+            logger.error("Error with ReportLab PDF generation: %s", e)
             return self._generate_intake_form_simple(patient_data, filepath)
     
     def _generate_intake_form_simple(self, patient_data, filepath):
         """Generate simple text-based intake form"""
         try:
-            content = f"""
-NEW PATIENT INTAKE FORM
-
-Medical Center
-123 Healthcare Drive
-Medical City, MC 12345
-Phone: (555) 123-4567
-Fax: (555) 123-4568
-
-================================================================================
-
-PATIENT INFORMATION
-Name: {patient_data['name']}
-Date of Birth: {patient_data['dob']}
-Phone: {patient_data.get('phone', '')}
-Email: {patient_data.get('email', '')}
-Appointment Date: {patient_data['appointment']['date']}
-Appointment Time: {patient_data['appointment']['time']}
-Doctor: {patient_data['doctor']}
-
-INSURANCE INFORMATION
-Primary Insurance: {patient_data.get('carrier', '')}
-Member ID: {patient_data.get('member_id', '')}
-Group Number: {patient_data.get('group_number', '')}
-
-================================================================================
-
-MEDICAL HISTORY (Please complete the following sections)
-
-Current Medications:
-_________________________________________________________________
-_________________________________________________________________
-_________________________________________________________________
-
-Allergies:
-_________________________________________________________________
-_________________________________________________________________
-
-Previous Surgeries:
-_________________________________________________________________
-_________________________________________________________________
-
-Family Medical History:
-_________________________________________________________________
-_________________________________________________________________
-_________________________________________________________________
-
-Current Symptoms/Reason for Visit:
-_________________________________________________________________
-_________________________________________________________________
-_________________________________________________________________
-
-Emergency Contact:
-Name: _________________________________ Phone: _______________
-Relationship: _____________________________
-
-================================================================================
-
-CONSENT
-I consent to treatment and authorize the release of medical information 
-for insurance purposes.
-
-Patient Signature: _______________________________ Date: __________
-
-================================================================================
-
-Please complete this form and bring it to your appointment, or submit it 
-online through our patient portal.
-
-Thank you for choosing Medical Center!
-"""
+            content = "\n".join((
+                *_SIMPLE_INTAKE_HEADER,
+                f"Name: {patient_data['name']}",
+                f"Date of Birth: {patient_data['dob']}",
+                f"Phone: {patient_data.get('phone', '')}",
+                f"Email: {patient_data.get('email', '')}",
+                f"Appointment Date: {patient_data['appointment']['date']}",
+                f"Appointment Time: {patient_data['appointment']['time']}",
+                f"Doctor: {patient_data['doctor']}",
+                "",
+                "INSURANCE INFORMATION",
+                f"Primary Insurance: {patient_data.get('carrier', '')}",
+                f"Member ID: {patient_data.get('member_id', '')}",
+                f"Group Number: {patient_data.get('group_number', '')}",
+                *_SIMPLE_INTAKE_FOOTER
+            ))
             
             # Write to text file (since we can't generate actual PDF without reportlab)
             txt_filepath = filepath.replace('.pdf', '.txt')
-            with open(txt_filepath, 'w') as f:
-                f.write(content)
+            _write_text(txt_filepath, content)
             
-            print(f"Intake form generated (text format): {txt_filepath}")
+            logger.info("Intake form generated (text format): %s", txt_filepath)
             return txt_filepath
             
         except Exception as e:
-            print(f"Error generating simple intake form: {e}")
+            logger.error("Error generating simple intake form: %s", e)
             return None
     
+    def _render_appointment_summary(self, patient_data):
+        """Return the (file path, text) of an appointment summary"""
+        filename = f"appointment_summary_{patient_data['name'].replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.txt"
+        
+        content = _FMT_APPOINTMENT_SUMMARY(
+            name=patient_data['name'],
+            dob=patient_data['dob'],
+            appointment_date=patient_data['appointment']['date'],
+            appointment_time=patient_data['appointment']['time'],
+            doctor=patient_data['doctor'],
+            duration=patient_data['appointment']['duration'],
+            appointment_id=patient_data.get('appointment_id', 'N/A'),
+            phone=patient_data.get('phone', ''),
+            email=patient_data.get('email', ''),
+            carrier=patient_data.get('carrier', ''),
+            member_id=patient_data.get('member_id', ''),
+            group_number=patient_data.get('group_number', ''),
+            intake_reminder="Complete your intake form before the appointment" if not patient_data.get('is_returning') else ""
+        )
+        
+        return os.path.join(self.output_dir, filename), content
+    
     def generate_appointment_summary(self, patient_data):
         """Generate appointment summary PDF"""
         try:
-            filename = f"appointment_summary_{patient_data['name'].replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.pdf"
-            filepath = os.path.join(self.output_dir, filename)
+            txt_filepath, content = self._render_appointment_summary(patient_data)
+            _write_text(txt_filepath, content)
             
-            content = f"""
-APPOINTMENT CONFIRMATION SUMMARY
-
-Medical Center
-123 Healthcare Drive
-Medical City, MC 12345
-Phone: (555) 123-4567
-
-================================================================================
-
-APPOINTMENT DETAILS
-
-Patient: {patient_data['name']}
-Date of Birth: {patient_data['dob']}
-Appointment Date: {patient_data['appointment']['date']}
-Appointment Time: {patient_data['appointment']['time']}
-Doctor: {patient_data['doctor']}
-Duration: {patient_data['appointment']['duration']} minutes
-Appointment ID: {patient_data.get('appointment_id', 'N/A')}
-
-Contact Information:
-Phone: {patient_data.get('phone', '')}
-Email: {patient_data.get('email', '')}
-
-Insurance Information:
-Carrier: {patient_data.get('carrier', '')}
-Member ID: {patient_data.get('member_id', '')}
-Group Number: {patient_data.get('group_number', '')}
-
-================================================================================
-
-IMPORTANT REMINDERS
-
-- Please arrive 15 minutes early for check-in
-- Bring a valid photo ID and insurance card
-- {"Complete your intake form before the appointment" if not patient_data.get('is_returning') else ""}
-- If you need to cancel or reschedule, please call at least 24 hours in advance
-
-Thank you for choosing Medical Center!
-"""
-            
-            txt_filepath = filepath.replace('.pdf', '.txt')
-            with open(txt_filepath, 'w') as f:
-                f.write(content)
-            
-            print(f"Appointment summary generated: {txt_filepath}")
+            logger.info("Appointment summary generated: %s", txt_filepath)
             return txt_filepath
             
         except Exception as e:
-            print(f"Error generating appointment summary: {e}")
+            logger.error("Error generating appointment summary: %s", e)
             return None
+    
+    def generate_batch(self, patient_list):
+        """Generate appointment summaries for many patients; returns a path (or None) per patient"""
+        # Render everything first, then write the files back to back
+        rendered = []
+        for patient_data in patient_list:
+            try:
+                rendered.append(self._render_appointment_summary(patient_data))
+            except Exception as e:
+                logger.error("Error generating appointment summary: %s", e)
+                rendered.append(None)
+        
+        paths = []
+        for item in rendered:
+            if item is None:
+                paths.append(None)
+                continue
+            
+            txt_filepath, content = item
+            try:
+                _write_text(txt_filepath, content)
+                paths.append(txt_filepath)
+            except OSError as e:
+                logger.error("Error writing appointment summary %s: %s", txt_filepath, e)
+                paths.append(None)
+        
+        logger.info("Generated %d of %d appointment summaries", sum(path is not None for path in paths), len(patient_list))
+        return paths
+    
+    def generate_many(self, patient_list):
+        """Generate intake forms for many patients; returns a path (or None) per patient"""
+        patient_list = list(patient_list)
+        if not patient_list:
+            return []
+        
+        # Threads rather than a process pool: each form is a few KB of text
+        # drawn in well under a millisecond, so pickling patients and paths
+        # to worker processes would cost more than the rendering itself. The
+        # threads overlap the file writes, and the cached form reader is shared
+        workers = min(8, os.cpu_count() or 1, len(patient_list))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.generate_intake_form, patient_list))
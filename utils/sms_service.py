@@ -1,5 +1,38 @@
+import logging
 import os
-from twilio.rest import Client
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Bulk sends are network-bound, so a few threads overlap the Twilio round-trips
+MAX_BULK_SMS_WORKERS = 16
+
+# Deletes every Latin-1 non-digit in one translate() pass; anything left that
+# isn't a digit is rarer Unicode, handled by the regex
+_NON_DIGIT = re.compile(r'\D')
+_NON_DIGIT_DELETE = str.maketrans('', '', ''.join(chr(c) for c in range(256) if not chr(c).isdecimal()))
+
+# Punctuation dropped from numbers before sending
+_PHONE_STRIP = str.maketrans('', '', '()- ')
+
+# Digit count -> E.164 form of an Indian number (None if the digits don't fit)
+_INDIAN_E164_BY_LENGTH = {
+    10: lambda digits: f'+91{digits}',
+    12: lambda digits: f'+{digits}' if digits.startswith('91') else None,
+}
+
+def _normalize_indian(digits):
+    """Return +91XXXXXXXXXX for a 10-digit or 91-prefixed 12-digit number, else None"""
+    to_e164 = _INDIAN_E164_BY_LENGTH.get(len(digits))
+    return to_e164(digits) if to_e164 else None
+
+def _digits_only(phone_number):
+    """Strip all non-digit characters from a phone number"""
+    clean_number = phone_number.translate(_NON_DIGIT_DELETE)
+    if clean_number.isdecimal():
+        return clean_number
+    return _NON_DIGIT.sub('', clean_number)
 
 class SMSService:
     """Service for sending SMS messages via Twilio"""
@@ -13,28 +46,39 @@ class SMSService:
         # For development/testing, we'll use mock sending if credentials not provided
         self.mock_mode = not all([self.account_sid, self.auth_token, self.twilio_phone_number])
         
+        # Set SMS_MOCK_SILENT=1 to skip mock output, e.g. for large mock bulk sends
+        self.mock_silent = os.getenv('SMS_MOCK_SILENT') == '1'
+        
         if not self.mock_mode:
-            self.client = Client(self.account_sid, self.auth_token)
+            # Imported here so mock mode never loads twilio's module tree
+            from twilio.rest import Client
+            self.client = Client(self.account_sid, self.auth_token, http_client=self._build_http_client())
+    
+    def _build_http_client(self):
+        """Twilio HTTP client with a keep-alive pool sized for bulk sends"""
+        from requests.adapters import HTTPAdapter
+        from twilio.http.http_client import TwilioHttpClient
+        
+        # One pooled session shared by all sends; the pool holds more than
+        # MAX_BULK_SMS_WORKERS connections so bulk threads never wait on it
+        http_client = TwilioHttpClient()
+        http_client.session.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=32))
+        return http_client
     
     def send_sms(self, phone_number, message):
         """Send SMS message to the specified phone number"""
+        if self.mock_mode:
+            if not self.mock_silent:
+                logger.info("[MOCK SMS] To: %s\n[MOCK SMS] Message: %s", phone_number, message)
+            return True
+        
         try:
-            if self.mock_mode:
-                print(f"[MOCK SMS] To: {phone_number}")
-                print(f"[MOCK SMS] Message: {message}")
-                return True
-            
             # Clean and format phone number for Indian numbers
-            clean_number = phone_number.replace("(", "").replace(")", "").replace("-", "").replace(" ", "")
+            clean_number = phone_number.translate(_PHONE_STRIP)
             
-            # Handle Indian phone numbers (+91)
+            # Handle Indian phone numbers (+91); anything else gets +91 prepended
             if not clean_number.startswith('+'):
-                if clean_number.startswith('91') and len(clean_number) == 12:
-                    phone_number = f'+{clean_number}'
-                elif len(clean_number) == 10:
-                    phone_number = f'+91{clean_number}'
-                else:
-                    phone_number = f'+91{clean_number}'
+                phone_number = _normalize_indian(clean_number) or f'+91{clean_number}'
             else:
                 phone_number = clean_number
             
@@ -45,58 +89,48 @@ class SMSService:
                 to=phone_number
             )
             
-            print(f"SMS sent successfully to {phone_number}. Message SID: {message.sid}")
+            logger.info("SMS sent successfully to %s. Message SID: %s", phone_number, message.sid)
             return True
             
         except Exception as e:
-            print(f"Error sending SMS to {phone_number}: {e}")
+            logger.error("Error sending SMS to %s: %s", phone_number, e)
             return False
     
     def send_bulk_sms(self, phone_numbers, message):
         """Send SMS to multiple phone numbers"""
-        results = []
-        
-        for phone_number in phone_numbers:
-            result = self.send_sms(phone_number, message)
-            results.append({
-                'phone_number': phone_number,
-                'success': result
-            })
+        phone_numbers = list(phone_numbers)
+        if not phone_numbers:
+            return []
         
-        return results
+        workers = min(MAX_BULK_SMS_WORKERS, len(phone_numbers))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            sent = executor.map(lambda phone_number: self.send_sms(phone_number, message), phone_numbers)
+            
+            return [
+                {'phone_number': phone_number, 'success': result}
+                for phone_number, result in zip(phone_numbers, sent)
+            ]
     
     def validate_phone_number(self, phone_number):
         """Validate phone number format for Indian numbers"""
-        import re
-        
         # Remove all non-digit characters
-        clean_number = re.sub(r'\D', '', phone_number)
+        clean_number = _digits_only(phone_number)
         
-        # Check if it's a valid Indian phone number
-        if len(clean_number) == 10:
-            return f'+91{clean_number}'
-        elif len(clean_number) == 12 and clean_number.startswith('91'):
-            return f'+{clean_number}'
-        elif len(clean_number) == 13 and clean_number.startswith('91'):
-            return f'+{clean_number[:12]}'
-        else:
-            return None
+        # Check if it's a valid Indian phone number; a 13th digit after a
+        # 91 prefix is treated as a typo and dropped
+        if len(clean_number) == 13 and clean_number.startswith('91'):
+            clean_number = clean_number[:12]
+        
+        return _normalize_indian(clean_number)
     
     def format_phone_for_display(self, phone_number):
         """Format phone number for display in Indian format"""
-        import re
-        
         # Remove all non-digit characters
-        clean_number = re.sub(r'\D', '', phone_number)
+        clean_number = _digits_only(phone_number)
         
-        if len(clean_number) >= 10:
-            # Handle Indian phone numbers
-            if clean_number.startswith('91'):
-                # Remove country code for formatting
-                number_part = clean_number[2:]
-                if len(number_part) == 10:
-                    return f'+91 - {number_part[:5]} {number_part[5:]}'
-            elif len(clean_number) == 10:
-                return f'+91 - {clean_number[:5]} {clean_number[5:]}'
+        # Handle Indian phone numbers
+        e164 = _normalize_indian(clean_number)
+        if e164:
+            return f'+91 - {e164[3:8]} {e164[8:]}'
         
         return phone_number